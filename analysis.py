@@ -15,10 +15,16 @@ st.subheader("Experiment to load")
 
 experiment_folder = st.text_input(label="Experiment folder", value="experiment_outputs")
 
-if experiment_folder == "experiment_outputs":
-    rl = ResultLoader()
-else:
-    rl = ResultLoader(path=experiment_folder)
+
+@st.cache_resource
+def result_loader(experiment_folder: str):
+    """A loader per folder, kept across reruns so loaded runs stay in memory"""
+    if experiment_folder == "experiment_outputs":
+        return ResultLoader()
+    return ResultLoader(path=experiment_folder)
+
+
+rl = result_loader(experiment_folder)
 
 
 experiments = rl.list_experiments()
@@ -33,9 +39,8 @@ experiment_version = st.selectbox(
     format_func=rl.nice_experiment_version,
 )
 
-inputs, results, cost_benefit, errors = rl.load_experiment_version_run(
-    experiment=experiment, experiment_version=experiment_version
-)
+run = rl.load_run(experiment=experiment, experiment_version=experiment_version)
+inputs, results, cost_benefit, errors = run.as_tuple()
 
 st.success(
     f"""
@@ -45,6 +50,25 @@ st.success(
     """
 )
 
+events = rl.load_run_events(experiment, experiment_version)
+
+if not events.empty:
+    from results.health import run_health, throughput, phase_percentiles
+
+    with st.expander("Run health"):
+        health = run_health(events)
+        columns = st.columns(4)
+        columns[0].metric("Points", health["points"])
+        columns[1].metric("Points / min", f"{health['points_per_min'] or 0:.1f}")
+        columns[2].metric("p95 latency (s)", f"{health['p95_latency_s'] or 0:.1f}")
+        columns[3].metric("Error rate", f"{100 * health['error_rate']:.1f}%")
+
+        st.caption("Points and errors per minute")
+        st.line_chart(throughput(events))
+
+        st.caption("Time per phase of a point (s)")
+        st.dataframe(phase_percentiles(events))
+
 # TODO
 # Statistics of inputs
 # Statistics of results
@@ -65,7 +89,7 @@ sort_by = st.selectbox(
 
 from results.plotting import plot_kpi
 
-fig = plot_kpi(results, level, sort_by=sort_by)
+fig = plot_kpi(results, level, sort_by=sort_by, pivot=run.kpis(level))
 
 from streamlit_plotly_events import plotly_events
 
@@ -76,7 +100,7 @@ if selected_point:
 
     st.subheader(f"Selected UUID: {uuid}")
 
-    selected_inputs = inputs.query("uuid == @uuid").drop("uuid", axis=1)
+    selected_inputs = run.rows("inputs", uuid).drop("uuid", axis=1)
     selected_inputs["slider_name"] = selected_inputs["id"].map(slider_names)
     selected_inputs = selected_inputs.set_index("slider_name")
 
@@ -85,13 +109,13 @@ if selected_point:
     st.subheader("Cost benefit analysis")
 
     with st.expander("Cost benefit - overview"):
-        st.dataframe(rl.cost_benefit_overview(cost_benefit, uuid))
+        st.dataframe(run.cost_benefit_overview(uuid))
 
     with st.expander("Cost benefit - detail"):
-        options = rl.cost_benefit_detail_options(cost_benefit, uuid)
+        options = run.cost_benefit_detail_options(uuid)
         detail = st.selectbox("Select subgroup", options)
 
-        st.dataframe(rl.cost_benefit_detail(cost_benefit, uuid, detail))
+        st.dataframe(run.cost_benefit_detail(uuid, detail))
 
     st.subheader("Source files")
 
@@ -104,6 +128,123 @@ if selected_point:
     )
 
 
+with st.expander("Cost benefit - across all points"):
+    cost_benefit_table = run.cost_benefit_table()
+    actors = cost_benefit_table.data["actor"].cat.categories
+    if len(actors):
+        actor = st.selectbox(
+            "Select actor",
+            options=actors,
+            index=actors.get_loc("Netto kosten") if "Netto kosten" in actors else 0,
+        )
+        aggregate = st.selectbox("Aggregate", options=["mean", "min", "max", "sum"])
+        st.dataframe(
+            cost_benefit_table.aggregate(["group", "counterparty"], aggregate, actor=actor)
+            .unstack("counterparty")
+        )
+    else:
+        st.info("No cost benefit details in this experiment version")
+
+
+st.subheader("Sensitivity")
+
+# part of the cache keys, so tables are computed again when the run changes
+version = hash(rl.signature(rl.path / experiment / experiment_version))
+
+
+@st.cache_data(max_entries=8)
+def sensitivity_of_run(experiment_folder, experiment, experiment_version, level, version):
+    """Sensitivity tables of a level, computed again when a file of the run changes"""
+    from results.sensitivity import sensitivity
+
+    run = result_loader(experiment_folder).load_run(experiment, experiment_version)
+    return sensitivity(run.inputs, run.results, level)
+
+
+with st.expander("Sensitivity of the KPIs to the inputs"):
+    tables = sensitivity_of_run(
+        experiment_folder, experiment, experiment_version, level, version
+    )
+    indices = tables["indices"].rename(index=slider_names, level="input")
+
+    st.caption("First order indices (S1), the share of variance explained per input")
+    st.bar_chart(indices.S1.unstack("kpi"))
+
+    st.caption("First (S1) and total (ST) order indices")
+    st.dataframe(indices)
+
+    st.caption("Strongest interactions (S2)")
+    interactions = tables["interactions"].rename(index=slider_names, level="a")
+    interactions = interactions.rename(index=slider_names, level="b")
+    st.dataframe(interactions.sort_values("S2", ascending=False).head(10))
+
+    effect_input = st.selectbox(
+        "Main effects of input",
+        options=tables["main_effects"].input.unique(),
+        format_func=lambda x: slider_names.get(x, x),
+    )
+    effects = tables["main_effects"].query("input == @effect_input")
+    effects = effects.pivot(index="value", columns="kpi", values="effect")
+    st.line_chart(effects.rename(index=str))
+
+
+st.subheader("Pareto front")
+
+
+@st.cache_data(max_entries=8)
+def ranks_of_run(experiment_folder, experiment, experiment_version, objectives, version):
+    """Pareto ranks of the objectives, computed again when a file of the run changes"""
+    from results.pareto import rank_results
+
+    run = result_loader(experiment_folder).load_run(experiment, experiment_version)
+    return rank_results(run.results, objectives)
+
+with st.expander("Trade-off between KPIs"):
+    from results.pareto import default_objectives, front_with_inputs, export_front
+    import plotly.express as px
+
+    pareto_kpis = st.multiselect(
+        "Objectives (costs and netload are minimized, the others maximized)",
+        options=results.kpi.unique(),
+        default=["costs", "self_sufficiency"],
+        format_func=lambda x: x.replace("_", " ").capitalize(),
+    )
+
+    if len(pareto_kpis) >= 2:
+        ranked = ranks_of_run(
+            experiment_folder,
+            experiment,
+            experiment_version,
+            default_objectives(level, pareto_kpis),
+            version,
+        )
+        max_rank = st.number_input("Show ranks up to", min_value=1, value=1)
+
+        points = ranked.reset_index()
+        points["front"] = np.where(points["rank"] <= max_rank, "front", "dominated")
+        fig = px.scatter(
+            points,
+            x=ranked.columns[0],
+            y=ranked.columns[1],
+            color="front",
+            hover_data=["uuid", "rank"],
+            template="plotly_dark",
+        )
+        st.plotly_chart(fig)
+
+        front = front_with_inputs(ranked, inputs, max_rank)
+        st.dataframe(front.rename(columns=slider_names))
+
+        if st.button("Prepare export of the front"):
+            scenarios = rl.get_scenario_files(experiment, experiment_version, front.index)
+            st.download_button(
+                label="Download front with inputs and scenario files",
+                data=export_front(front, scenarios),
+                file_name=f"pareto_front_{experiment}_{experiment_version}.zip",
+                mime="application/zip",
+            )
+
+
 # def dataframe_with_selections(df):
 #     df_with_selections = df.copy()
 #     df_with_selections.insert(0, "Select", False)
@@ -0,0 +1,151 @@
+"""End-to-end benchmark of running sweeps against the local HOLON API stand-in
+
+Runs a sweep of --points points per execution mode against benchmarks.mock_server and
+reports throughput, p95 request latency, peak memory and the number of requests the
+server received. Every mode runs in a fresh process, so the peak memory (max RSS) of
+one mode does not carry over to the next. Run from the repository root:
+
+    python -m benchmarks.bench_e2e --points 200 --workers 8 --mean 0.2
+
+The options of the server (latency distribution, error and 429 rates, payload size)
+are those of `python -m benchmarks.mock_server`.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.mock_server import MockHOLONServer, add_arguments, server_options
+
+ROOT = Path(__file__).parent.parent
+
+# options of Experiment.run per mode, workers=None uses --workers
+MODES = {
+    "serial": dict(workers=1),
+    "threaded": dict(workers=None),
+    "threaded-parquet": dict(workers=None, output_format="parquet"),
+    "threaded-cached": dict(workers=None, local_cache=True),
+    "async": dict(workers=None, scheduler="async"),
+}
+
+
+def experiment_config(url: str, points: int) -> dict:
+    return {
+        "scenario_id": 444001,
+        "title": "benchmark",
+        "description": "end-to-end benchmark against the mock server",
+        "base_url": url,
+        "interactive_inputs": {
+            "base": None,
+            "sweep": {
+                "vary_base_electrification": {
+                    "id": 444024,
+                    "lower_bound": 0,
+                    "upper_bound": points - 1,
+                    "step": 1,
+                }
+            },
+        },
+    }
+
+
+def peak_memory_mb():
+    """Max RSS of this process in MB, None where the resource module is unavailable"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+def run_mode(mode: str, url: str, points: int, workers: int, folder: str) -> dict:
+    """Run the sweep in a mode, returns its measurements"""
+    from experiment import Experiment
+
+    options = dict(MODES[mode])
+    if options["workers"] is None:
+        options["workers"] = workers
+
+    def run():
+        experiment = Experiment(**experiment_config(url, points))
+        experiment.config_path = Path(folder) / "benchmark.yaml"
+        with contextlib.redirect_stdout(io.StringIO()):
+            experiment.run(
+                disable_caching=False, enable_sentry_logging=False, **options
+            )
+        return experiment
+
+    if options.get("local_cache"):
+        run()  # fill the cache, the second run is measured
+
+    start = time.perf_counter()
+    experiment = run()
+    elapsed = time.perf_counter() - start
+
+    timings = experiment.timings
+    return {
+        "elapsed": elapsed,
+        "points_per_s": points / elapsed,
+        "p95": timings["total"].quantile(0.95) if len(timings) else None,
+        "errors": len(experiment.errors),
+        "peak_mb": peak_memory_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES))
+    parser.add_argument("--run-mode", choices=list(MODES), help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    parser.add_argument("--folder", help=argparse.SUPPRESS)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    if args.run_mode is not None:
+        # a single mode, in a process started by the benchmark
+        result = run_mode(
+            args.run_mode, args.url, args.points, args.workers, args.folder
+        )
+        print(json.dumps(result))
+        return
+
+    print(
+        f"{'mode':<18} {'points/s':>9} {'p95 [s]':>8} {'errors':>7} "
+        f"{'requests':>9} {'peak [MB]':>10}"
+    )
+    with MockHOLONServer(
+        **server_options(args)
+    ) as server, tempfile.TemporaryDirectory() as folder:
+        for mode in args.modes:
+            requests = server.requests
+            command = [
+                sys.executable,
+                "-m",
+                "benchmarks.bench_e2e",
+                *["--run-mode", mode, "--url", server.url, "--folder", folder],
+                *["--points", str(args.points), "--workers", str(args.workers)],
+            ]
+            output = subprocess.run(
+                command, cwd=ROOT, check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            p95 = "-" if result["p95"] is None else f"{result['p95']:.3f}"
+            peak = "-" if result["peak_mb"] is None else f"{result['peak_mb']:.0f}"
+            print(
+                f"{mode:<18} {result['points_per_s']:>9.1f} {p95:>8} "
+                f"{result['errors']:>7} {server.requests - requests:>9} {peak:>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Micro-benchmark of parsing a response and archiving its scenario
+
+Compares full pydantic validation of the decoded response followed by re-encoding the
+scenario with the standard library, as was done before, to the fast path of
+`HOLONResponse.from_json` and `json_dumps` (using orjson if it is installed). Responses
+are built from fixture/succes_response.json by repeating the grid connections of the
+scenario until it reaches the requested size. Run from the repository root:
+
+    python -m benchmarks.bench_parse --sizes 1 10 50
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from results.response import HOLONResponse, json_dumps, orjson
+
+FIXTURE = Path(__file__).parent.parent / "fixture" / "succes_response.json"
+
+
+def scaled_body(response: dict, megabytes: float) -> bytes:
+    """Encode the response with its grid connections repeated to about `megabytes`"""
+    scenario = response["scenario"]
+    connections = scenario["gridconnections"]
+    size = len(json.dumps(connections))
+    repeat = max(1, round(megabytes * 1024**2 / size))
+    scaled = {**scenario, "gridconnections": connections * repeat}
+    return json.dumps({**response, "scenario": scaled}).encode()
+
+
+def legacy_parse(body: bytes) -> bytes:
+    """Parse and archive the way run_point did before"""
+    result = HOLONResponse(**json.loads(body))
+    return json.dumps(result.scenario).encode()
+
+
+def fast_parse(body: bytes) -> bytes:
+    """Parse and archive the way run_point does now"""
+    result = HOLONResponse.from_json(body)
+    return json_dumps(result.scenario)
+
+
+def measure(parse, body: bytes, repeat: int) -> float:
+    """Return the best wall time in milliseconds of `repeat` runs"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(body)
+        best = min(best, time.perf_counter() - start)
+    return 1000 * best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=float,
+        nargs="+",
+        default=[0.03, 1, 10, 50],
+        help="scenario sizes in MB",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with open(FIXTURE, "r") as f:
+        response = json.load(f)
+
+    print(f"orjson: {'yes' if orjson is not None else 'no'}")
+    print(f"{'size [MB]':>10} {'legacy [ms]':>12} {'fast [ms]':>10} {'speedup':>8}")
+    for megabytes in args.sizes:
+        body = scaled_body(response, megabytes)
+        legacy = measure(legacy_parse, body, args.repeat)
+        fast = measure(fast_parse, body, args.repeat)
+        size = len(body) / 1024**2
+        print(f"{size:>10.2f} {legacy:>12.1f} {fast:>10.1f} {legacy / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Micro-benchmark of building the result tables of an experiment
+
+Compares the row-by-row `df.loc` construction with pd.concat that was used before to
+gathering rows and building every table in one step. Synthetic points are built from
+fixture/succes_response.json. Run from the repository root:
+
+    python -m benchmarks.bench_tables --points 10000 100000
+
+The legacy construction takes seconds per thousand points, so by default it is only
+measured for the smallest size.
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+from experiment import Experiment, INPUT_COLUMNS
+from results.response import HOLONResponse, DASHBOARD_COLUMNS, COST_BENEFIT_COLUMNS
+
+FIXTURE = Path(__file__).parent.parent / "fixture" / "succes_response.json"
+
+INTERACTIVE_ELEMENTS = [
+    {"interactive_element": 444025, "value": "true"},
+    {"interactive_element": 440022, "value": "B"},
+    {"interactive_element": 444024, "value": 40},
+]
+
+
+def legacy_tables(response: HOLONResponse, n_points: int):
+    """Build the tables the way store_results did before, one small dataframe per point"""
+    results, inputs, cost_benefit = [], [], []
+    for i in range(n_points):
+        uuid = str(i)
+        df = pd.DataFrame(columns=INPUT_COLUMNS)
+        for ie in INTERACTIVE_ELEMENTS:
+            df.loc[len(df)] = [uuid, ie["interactive_element"], ie["value"]]
+        inputs.append(df)
+
+        df = pd.DataFrame(columns=DASHBOARD_COLUMNS)
+        for level, kpi_set in response.dashboard_results:
+            for name, value in kpi_set:
+                df.loc[len(df)] = [uuid, level, name, value]
+        results.append(df)
+
+        cost_benefit.append(
+            pd.DataFrame(
+                columns=COST_BENEFIT_COLUMNS,
+                data=[[uuid, response.cost_benefit_results.overview, {}]],
+            )
+        )
+    return pd.concat(results), pd.concat(inputs), pd.concat(cost_benefit)
+
+
+def columnar_tables(response: HOLONResponse, n_points: int):
+    """Build the tables the way store_results does now, gathering rows first"""
+    results, inputs, cost_benefit = [], [], []
+    for i in range(n_points):
+        uuid = str(i)
+        inputs.extend(Experiment.interactive_to_records(INTERACTIVE_ELEMENTS, uuid))
+        results.extend(response.dashboard_results.to_records(uuid))
+        cost_benefit.extend(response.cost_benefit_results.to_records(uuid))
+    return (
+        pd.DataFrame.from_records(results, columns=DASHBOARD_COLUMNS),
+        pd.DataFrame.from_records(inputs, columns=INPUT_COLUMNS),
+        pd.DataFrame.from_records(cost_benefit, columns=COST_BENEFIT_COLUMNS),
+    )
+
+
+def measure(build, response: HOLONResponse, n_points: int):
+    """Return wall time in seconds and peak traced memory in MB of building the tables
+
+    Tracing slows down allocations a lot, so time and memory are measured in separate runs.
+    """
+    start = time.perf_counter()
+    build(response, n_points)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    build(response, n_points)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024**2
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--points", type=int, nargs="+", default=[1_000, 10_000, 100_000]
+    )
+    parser.add_argument(
+        "--legacy-max",
+        type=int,
+        default=1_000,
+        help="skip the (slow) legacy construction above this number of points",
+    )
+    args = parser.parse_args()
+
+    with open(FIXTURE, "r") as f:
+        response = HOLONResponse(**json.load(f))
+
+    print(f"{'method':<10} {'points':>8} {'time [s]':>10} {'peak [MB]':>10}")
+    for n_points in args.points:
+        builders = {"columnar": columnar_tables}
+        if n_points <= args.legacy_max:
+            builders["legacy"] = legacy_tables
+        for name, build in builders.items():
+            elapsed, peak = measure(build, response, n_points)
+            print(f"{name:<10} {n_points:>8} {elapsed:>10.2f} {peak:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""Local stand-in for the HOLON API, for offline load tests and benchmarks
+
+Serves POST requests to the HOLON endpoint with fixture/succes_response.json, or with
+fixture/error_response.json (status 500) for a fraction of the requests. The latency
+of a response is drawn from a distribution, requests above a concurrency limit (or a
+random fraction of them) get a 429 with a Retry-After header, and the scenario of the
+response can be scaled up to a realistic size. Run from the repository root:
+
+    python -m benchmarks.mock_server --port 8000 --latency lognormal --mean 0.5
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from experiment import ENDPOINT
+
+FIXTURES = Path(__file__).parent.parent / "fixture"
+
+LATENCIES = ("constant", "uniform", "exponential", "lognormal")
+
+
+class MockHOLONServer:
+    """HOLON API stand-in serving from a background thread, see the module docstring
+
+    latency is one of LATENCIES with the given mean in seconds (sigma is the shape of
+    the lognormal distribution). Use as a context manager or call start/stop.
+    """
+
+    def __init__(
+        self,
+        port: int = 0,
+        latency: str = "constant",
+        mean: float = 0.1,
+        sigma: float = 0.5,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        max_concurrency: int = None,
+        retry_after: float = 1.0,
+        payload_mb: float = None,
+        seed: int = None,
+    ) -> None:
+        if latency not in LATENCIES:
+            raise ValueError(f"latency (={latency}) should be one of {LATENCIES}")
+        self.latency = latency
+        self.mean = mean
+        self.sigma = sigma
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.max_concurrency = max_concurrency
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+        with open(FIXTURES / "succes_response.json", "r") as f:
+            response = json.load(f)
+        if payload_mb is not None:
+            from benchmarks.bench_parse import scaled_body
+
+            self.success = scaled_body(response, payload_mb)
+        else:
+            self.success = json.dumps(response).encode()
+        with open(FIXTURES / "error_response.json", "rb") as f:
+            self.error = f.read()
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self.handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """Base url of the server, to use as base_url of an experiment"""
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def delay(self) -> float:
+        """Draw the latency of a response in seconds"""
+        with self._lock:
+            if self.latency == "constant":
+                return self.mean
+            if self.latency == "uniform":
+                return self.random.uniform(0, 2 * self.mean)
+            if self.latency == "exponential":
+                return self.random.expovariate(1 / self.mean)
+            # lognormal with the given mean
+            mu = math.log(self.mean) - self.sigma**2 / 2
+            return self.random.lognormvariate(mu, self.sigma)
+
+    def respond(self):
+        """Return (status, headers, body) of a request, waiting for its latency"""
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            throttled = (
+                self.max_concurrency is not None
+                and self.in_flight > self.max_concurrency
+            ) or self.random.random() < self.throttle_rate
+            failed = self.random.random() < self.error_rate
+        try:
+            if throttled:
+                headers = {"Retry-After": f"{self.retry_after:g}"}
+                return 429, headers, b"Too many requests"
+            time.sleep(self.delay())
+            if failed:
+                return 500, {"Content-Type": "application/json"}, self.error
+            return 200, {"Content-Type": "application/json"}, self.success
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # headers and body are separate writes on a kept-alive connection, with
+            # Nagle's algorithm every response would wait ~40 ms for a delayed ACK
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if self.path.split("?")[0] != ENDPOINT:
+                    status, headers, body = 404, {}, b"Not found"
+                else:
+                    status, headers, body = mock.respond()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Add the options of the mock server to a parser"""
+    parser.add_argument("--latency", default="constant", choices=LATENCIES)
+    parser.add_argument("--mean", type=float, default=0.1, help="mean latency [s]")
+    parser.add_argument("--sigma", type=float, default=0.5, help="lognormal shape")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--max-concurrency", type=int, default=None, help="429 above this"
+    )
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--payload-mb", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def server_options(args: argparse.Namespace) -> dict:
+    return dict(
+        latency=args.latency,
+        mean=args.mean,
+        sigma=args.sigma,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        max_concurrency=args.max_concurrency,
+        retry_after=args.retry_after,
+        payload_mb=args.payload_mb,
+        seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8000)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockHOLONServer(port=args.port, **server_options(args))
+    print(f"Serving the HOLON API stand-in on {server.url}{ENDPOINT}")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        server.server.server_close()
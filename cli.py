@@ -0,0 +1,140 @@
+"""Run an experiment on the HOLON API from the command line
+
+python cli.py base.yaml --profile threaded --cache results --output-format parquet
+python cli.py base.yaml --dry-run
+python cli.py experiment_outputs/<title>/<timestamp>  # resume an interrupted run
+"""
+
+import argparse
+from pathlib import Path
+from typing import List, Tuple, Union
+
+import pandas as pd
+
+from experiment import Experiment
+from execution.progress import format_duration
+from results.writer import EVENTS_FILE, OUTPUT_FORMATS
+
+# execution profiles, the number of workers of a profile can be changed with --workers
+PROFILES = {
+    "serial": {"scheduler": "serial", "workers": 1},
+    "threaded": {"scheduler": "threaded", "workers": 8},
+    "async": {"scheduler": "async", "workers": 32},
+}
+
+# which results are kept in the local cache next to the experiment yaml
+CACHE_POLICIES = {
+    "off": {"local_cache": False, "cache_errors": False},
+    "results": {"local_cache": True, "cache_errors": False},
+    "all": {"local_cache": True, "cache_errors": True},
+}
+
+
+def parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "experiment", help="experiment yaml, or the output folder of a run to resume"
+    )
+    parser.add_argument("--profile", default="serial", choices=list(PROFILES))
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="points in flight, overrides the profile",
+    )
+    parser.add_argument("--cache", default="off", choices=list(CACHE_POLICIES))
+    parser.add_argument(
+        "--no-api-cache", action="store_true", help="disable caching by the HOLON API"
+    )
+    parser.add_argument("--sentry", action="store_true", help="enable sentry logging")
+    parser.add_argument("--output-format", default=None, choices=OUTPUT_FORMATS)
+    parser.add_argument("--shard", default=None, help="only run shard i of N, e.g. 1/4")
+    parser.add_argument(
+        "--skip-previous-runs",
+        action="store_true",
+        help="skip points an earlier run of the scenario already stored",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="count the points to run, without running",
+    )
+    return parser
+
+
+def load(path: Union[str, Path]) -> Tuple[Experiment, Union[Path, None]]:
+    """Load an experiment yaml, or the experiment of an output folder to resume it"""
+    path = Path(path)
+    if path.is_dir():
+        return Experiment.load_from_folder(path), path
+    return Experiment.load_from_yaml(path), None
+
+
+def latency_estimate(experiment: Experiment):
+    """Median time of a request in the latest run of the experiment, with its version
+
+    (None, None) if no run of the experiment has an events log.
+    """
+    runs = sorted(
+        (experiment.outputs_folder / experiment.title).glob("*"), reverse=True
+    )
+    for folder in runs:
+        path = folder / EVENTS_FILE
+        if path.exists() and path.stat().st_size:
+            events = pd.read_json(path, lines=True, convert_dates=False)
+            if "post" in events and events.post.notna().any():
+                return float(events.post.median()), folder.name
+    return None, None
+
+
+def dry_run(
+    experiment: Experiment,
+    workers: int,
+    shard: str = None,
+    experiment_folder: Path = None,
+    skip_previous_runs: bool = False,
+):
+    """Print the points a run would post and estimate its duration from earlier runs"""
+    counts = experiment.count_points(shard, experiment_folder, skip_previous_runs)
+    print(f"Dry run of experiment {experiment.title}")
+    for name, count in counts.items():
+        print(f"  {name.replace('_', ' '):<24}{count:>8}")
+
+    latency, version = latency_estimate(experiment)
+    if latency is not None:
+        duration = counts["to_run"] * latency / workers
+        print(
+            f"  estimated duration {format_duration(duration)} "
+            f"({latency:.1f}s per point in run {version}, {workers} workers)"
+        )
+    return counts
+
+
+def main(argv: List[str] = None):
+    args = parser().parse_args(argv)
+    experiment, experiment_folder = load(args.experiment)
+    profile = PROFILES[args.profile]
+    workers = args.workers or profile["workers"]
+
+    if args.dry_run:
+        dry_run(
+            experiment, workers, args.shard, experiment_folder, args.skip_previous_runs
+        )
+        return experiment
+
+    experiment.run(
+        disable_caching=args.no_api_cache,
+        enable_sentry_logging=args.sentry,
+        workers=workers,
+        experiment_folder=experiment_folder,
+        output_format=args.output_format,
+        shard=args.shard,
+        skip_previous_runs=args.skip_previous_runs,
+        scheduler=profile["scheduler"],
+        **CACHE_POLICIES[args.cache],
+    )
+    return experiment
+
+
+if __name__ == "__main__":
+    main()
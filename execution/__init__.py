@@ -0,0 +1,5 @@
+from .client import HOLONClient
+from .cache import ResultCache
+from .checkpoint import RunManifest
+from .ratelimit import RateController
+from .progress import RunMonitor
@@ -0,0 +1,97 @@
+import gzip
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Union
+
+from results.response import HOLONErrorReponse, HOLONResponse
+
+from .planning import point_key
+
+
+class ResultCache:
+    """Content-addressed on-disk cache of parsed HOLON responses
+
+    Entries are keyed by the `point_key` of the inputs, so points with the same inputs
+    share an entry. When the cache grows beyond `max_bytes`, least recently used entries
+    are evicted.
+    """
+
+    def __init__(self, path: Path, max_bytes: int = 2 * 1024**3) -> None:
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._size = sum(entry.stat().st_size for entry in self.path.glob("*.json.gz"))
+
+    @staticmethod
+    def key(
+        base_url: str,
+        scenario_id: Union[int, str],
+        interactive_elements: List[Dict[str, Any]],
+    ) -> str:
+        """Return the cache key of a single point"""
+        return point_key(base_url, scenario_id, interactive_elements)
+
+    def _entry_path(self, key: str) -> Path:
+        return self.path / f"{key}.json.gz"
+
+    def get(self, key: str) -> Union[HOLONResponse, HOLONErrorReponse, None]:
+        """Return the cached result for key, or None if it is not in the cache"""
+        path = self._entry_path(key)
+        try:
+            with gzip.open(path, "rb") as f:
+                entry = json.load(f)
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+
+        if entry["type"] == "response":
+            return HOLONResponse.from_dict(entry["result"])
+        return HOLONErrorReponse.parse_obj(entry["result"])
+
+    def put(self, key: str, result: Union[HOLONResponse, HOLONErrorReponse]):
+        """Add a result to the cache, evicting old entries if the cache is full"""
+        entry = {
+            "type": "response" if isinstance(result, HOLONResponse) else "error",
+            "result": result.dict(),
+        }
+        path = self._entry_path(key)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        with gzip.open(tmp_path, "wt") as f:
+            json.dump(entry, f)
+        size = tmp_path.stat().st_size
+        os.replace(tmp_path, path)  # atomic, readers never see half written entries
+
+        with self._lock:
+            self._size += size
+            if self._size > self.max_bytes:
+                self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes"""
+        entries = [(entry.stat(), entry) for entry in self.path.glob("*.json.gz")]
+        entries.sort(key=lambda entry: entry[0].st_mtime)
+
+        self._size = sum(stat.st_size for stat, _ in entries)
+        for stat, entry in entries:
+            if self._size <= self.max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            self._size -= stat.st_size
+
+    def clear(self):
+        """Remove all entries from the cache"""
+        with self._lock:
+            for entry in self.path.glob("*.json.gz"):
+                entry.unlink(missing_ok=True)
+            self._size = 0
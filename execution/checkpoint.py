@@ -0,0 +1,55 @@
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Set
+
+
+class RunManifest:
+    """Append-only record of the points of a run that are completely stored on disk"""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def done(self) -> Set[int]:
+        """Return the indices of the points that are done
+
+        Failed points, e.g. requests that kept being throttled, are not done and are
+        run again when the run is resumed.
+        """
+        if not self.path.exists():
+            return set()
+        done = set()
+        with open(self.path, "r") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    if entry["status"] != "failed":
+                        done.add(entry["point"])
+        return done
+
+    def keys(self) -> Dict[str, str]:
+        """Return the uuids of the successful points by the key of their inputs"""
+        if not self.path.exists():
+            return {}
+        keys = {}
+        with open(self.path, "r") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    if entry["status"] == "ok" and entry.get("key") is not None:
+                        keys[entry["key"]] = entry["uuid"]
+        return keys
+
+    def add(self, point: int, uuid: str, status: str, key: str = None):
+        """Record a point with its status, call only after all its results are written
+
+        The key of the inputs of the point lets later runs skip points with equal inputs.
+        """
+        entry = {"point": point, "uuid": uuid, "status": status}
+        if key is not None:
+            entry["key"] = key
+        entry = json.dumps(entry)
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(entry + "\n")
@@ -0,0 +1,152 @@
+import json
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+import requests as r
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+from .ratelimit import RateController, THROTTLE_STATUSES
+
+# connect time of the request in flight on the current thread
+_timing = threading.local()
+
+
+class TimedHTTPConnection(HTTPConnection):
+    """HTTP connection that records the time spent connecting"""
+
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        _timing.connect = getattr(_timing, "connect", 0.0) + time.perf_counter() - start
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    """HTTPS connection that records the time spent connecting, TLS handshake included"""
+
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        _timing.connect = getattr(_timing, "connect", 0.0) + time.perf_counter() - start
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """Transport adapter whose connection pools use the timed connections"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+
+
+class HOLONClient:
+    """Pooled, keep-alive HTTP client for the HOLON API with retries and timings"""
+
+    def __init__(
+        self,
+        base_url: str,
+        pool_size: int = 10,
+        connect_timeout: float = 10,
+        read_timeout: float = 900,
+        retries: int = 3,
+        backoff_factor: float = 1.0,
+        controller: RateController = None,
+    ) -> None:
+        self.base_url = base_url
+        self.timeout = (connect_timeout, read_timeout)
+        self.controller = controller
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=THROTTLE_STATUSES,
+            allowed_methods=frozenset({"POST"}),
+            raise_on_status=False,
+        )
+        adapter = TimedHTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, max_retries=retry
+        )
+        self.session = r.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def configure(self, cookies: Dict[str, str], params: Dict[str, Any]):
+        """Set the cookies and query parameters sent with every request"""
+        self.session.cookies.update(cookies)
+        self.session.params.update(params)
+
+    def post(self, endpoint: str, payload: dict) -> Tuple[r.Response, Dict[str, float]]:
+        """Post a payload, returns the response and its timings in seconds
+
+        `ttfb` is the time from sending the request to receiving the response headers
+        (excluding connecting), so it mostly consists of simulation time on the server.
+        `serialize` is the time spent encoding the payload, it is not part of `total`.
+        With a rate controller, the request first waits for a free slot.
+        """
+        if self.controller is None:
+            return self._post(endpoint, payload)
+
+        slot = self.controller.acquire()
+        try:
+            response, timing = self._post(endpoint, payload)
+        except r.RequestException:
+            self.controller.release(slot, [None])
+            raise
+
+        # attempts retried by urllib3 are throttling signals as well
+        retries = getattr(response.raw, "retries", None)
+        history = [attempt.status for attempt in retries.history] if retries else []
+        self.controller.release(
+            slot,
+            [*history, response.status_code],
+            latency=timing["total"],
+            retry_after=self.controller.parse_retry_after(
+                response.headers.get("Retry-After")
+            ),
+        )
+        return response, timing
+
+    def _post(
+        self, endpoint: str, payload: dict
+    ) -> Tuple[r.Response, Dict[str, float]]:
+        start_serialize = time.perf_counter()
+        body = json.dumps(payload)
+        serialized = time.perf_counter()
+
+        _timing.connect = 0.0
+        start = time.perf_counter()
+        response = self.session.post(
+            url=self.base_url + endpoint,
+            data=body,
+            headers={"Content-Type": "application/json"},
+            timeout=self.timeout,
+            stream=True,
+        )
+        headers_received = time.perf_counter()
+        response.content  # download the body
+        end = time.perf_counter()
+
+        timing = {
+            "serialize": serialized - start_serialize,
+            "connect": _timing.connect,
+            "ttfb": headers_received - start - _timing.connect,
+            "download": end - headers_received,
+            "total": end - start,
+        }
+        return response, timing
+
+    def close(self):
+        self.session.close()
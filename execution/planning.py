@@ -0,0 +1,61 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Union
+
+from results.writer import MANIFEST_FILE
+
+from .checkpoint import RunManifest
+
+# why a point of a run is not posted
+SKIP_REASONS = ("constraint", "duplicate", "previous_run")
+
+
+def merge_elements(interactive_elements: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Return the interactive elements with a single element per id
+
+    A later element overrides an earlier one with the same id, so sweep elements
+    override base elements. The element keeps the position of the first one.
+    """
+    merged = {}
+    for ie in interactive_elements:
+        merged[ie["interactive_element"]] = ie
+    return list(merged.values())
+
+
+def canonical_value(value: Any) -> Any:
+    """The value as the scenario sees it, e.g. 40.0 and 40 are the same value"""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def point_key(
+    base_url: str,
+    scenario_id: Union[int, str],
+    interactive_elements: List[Dict[str, Any]],
+) -> str:
+    """Return a hash of the inputs of a point, equal for points with equal inputs"""
+    elements = sorted(
+        (ie["interactive_element"], canonical_value(ie["value"]))
+        for ie in merge_elements(interactive_elements)
+    )
+    payload = {"base_url": base_url, "scenario": str(scenario_id), "elements": elements}
+    return hashlib.sha256(json.dumps(payload).encode()).hexdigest()
+
+
+def previous_results(outputs_folder: Path, exclude: Path = None) -> Dict[str, str]:
+    """Map the keys of the points stored by earlier runs to <title>/<timestamp>/<uuid>
+
+    Only successful points are taken into account, points of runs from before the
+    manifest recorded keys are not.
+    """
+    previous = {}
+    for path in sorted(Path(outputs_folder).glob(f"*/*/{MANIFEST_FILE}")):
+        folder = path.parent
+        if exclude is not None and folder.resolve() == Path(exclude).resolve():
+            continue
+        run = folder.relative_to(outputs_folder).as_posix()
+        for key, uuid in RunManifest(path).keys().items():
+            previous.setdefault(key, f"{run}/{uuid}")
+    return previous
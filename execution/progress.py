@@ -0,0 +1,130 @@
+import json
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, TextIO
+
+import numpy as np
+
+# phases of a point that are timed, in seconds, also the columns of the events log
+PHASES = ["serialize", "connect", "ttfb", "download", "post", "parse", "store"]
+
+
+def format_duration(seconds: float) -> str:
+    """Format a duration in seconds as H:MM:SS"""
+    if not np.isfinite(seconds):
+        return "-:--:--"
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+class RunMonitor:
+    """Logs an event per point of a run to a JSON lines file and shows the progress
+
+    The progress line shows the points done out of the points of the run, the
+    throughput of this session, the p50/p95 request latency of the last `window`
+    requests, the error rate and the estimated time remaining. On a terminal the line
+    is redrawn in place (unless inline=False), otherwise a line is printed every
+    `interval` seconds. A label, e.g. the title of the experiment, prefixes the line.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        total: int,
+        done: int = 0,
+        stream: TextIO = None,
+        interval: float = None,
+        window: int = 1000,
+        label: str = None,
+        inline: bool = None,
+    ) -> None:
+        self.path = Path(path)
+        self.total = total
+        self.done = done
+        self.stream = sys.stdout if stream is None else stream
+        self.tty = hasattr(self.stream, "isatty") and self.stream.isatty()
+        if inline is not None:
+            self.tty = self.tty and inline
+        if interval is None:
+            interval = 0.5 if self.tty else 30.0
+        self.label = label
+        self.interval = interval
+        self.completed = 0
+        self.errors = 0
+        self.cached = 0
+        self.latencies = deque(maxlen=window)
+        self.start = time.perf_counter()
+        self._last_render = 0.0
+        self._lock = threading.Lock()
+
+    def point(
+        self,
+        point: int,
+        uuid: str,
+        status: str,
+        phases: Dict[str, float],
+        cached: bool = False,
+    ):
+        """Record a stored point, safe to call from multiple workers"""
+        event = {
+            "time": time.time(),
+            "point": point,
+            "uuid": uuid,
+            "status": status,
+            "cached": cached,
+            **{phase: phases.get(phase) for phase in PHASES},
+        }
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(event) + "\n")
+            self.completed += 1
+            self.errors += status != "ok"
+            self.cached += cached
+            if phases.get("post") is not None:
+                self.latencies.append(phases["post"])
+            now = time.perf_counter()
+            if now - self._last_render >= self.interval:
+                self._last_render = now
+                self.render()
+
+    def status(self) -> str:
+        """The progress line, e.g. [ 120/1000] 12.0% | 8.3 pts/min | ..."""
+        elapsed = time.perf_counter() - self.start
+        done = self.done + self.completed
+        rate = self.completed / elapsed if elapsed > 0 else 0.0
+        remaining = max(self.total - done, 0)
+        eta = remaining / rate if rate > 0 else float("inf")
+        width = len(str(self.total))
+        parts = [
+            f"[{done:>{width}}/{self.total}] {100 * done / max(self.total, 1):5.1f}%",
+            f"{60 * rate:.1f} pts/min",
+        ]
+        if self.latencies:
+            p50, p95 = np.percentile(self.latencies, [50, 95])
+            parts.append(f"p50 {p50:.1f}s p95 {p95:.1f}s")
+        parts.append(f"errors {100 * self.errors / max(self.completed, 1):.1f}%")
+        if self.cached:
+            parts.append(f"cached {self.cached}")
+        parts.append(f"ETA {format_duration(eta)}")
+        if self.label is not None:
+            parts.insert(0, self.label)
+        return " | ".join(parts)
+
+    def render(self):
+        if self.tty:
+            self.stream.write("\r\033[K" + self.status())
+        else:
+            self.stream.write(self.status() + "\n")
+        self.stream.flush()
+
+    def close(self):
+        """Show the final progress, ending the line that is redrawn on a terminal"""
+        with self._lock:
+            self.render()
+            if self.tty:
+                self.stream.write("\n")
+                self.stream.flush()
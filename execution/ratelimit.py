@@ -0,0 +1,131 @@
+import threading
+import time
+from typing import Any, Dict, List, Sequence
+
+from urllib3.util.retry import Retry
+
+# throttling and gateway errors, retried by the client and halving the concurrency, a
+# 500 is a simulation error of HOLON that would fail again and says nothing about the
+# load on the API
+THROTTLE_STATUSES = (429, 502, 503, 504)
+EVENT_COLUMNS = [
+    "time",
+    "base_url",
+    "event",
+    "status",
+    "limit",
+    "in_flight",
+    "retry_after",
+]
+
+
+class RateController:
+    """AIMD concurrency limit for the requests to the HOLON API
+
+    Every request waits for a free slot below the limit. The limit grows by one per
+    window of successful requests (additive increase) and is halved after a 429, a
+    502/503/504 or a failed request (multiplicative decrease). While the latency is
+    above `latency_factor` times the lowest latency seen, the limit does not grow. A
+    Retry-After header pauses all new requests. Every change is recorded in `events`.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        base_url: str = None,
+        initial: float = None,
+        min_concurrency: int = 1,
+        decrease: float = 0.5,
+        latency_factor: float = 3.0,
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.base_url = base_url
+        self.limit = float(initial or max_concurrency)
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+
+        self.in_flight = 0
+        self.min_latency = None
+        self.events: List[Dict[str, Any]] = []
+
+        self._condition = threading.Condition()
+        self._resume_at = 0.0
+        self._last_decrease = 0.0
+
+    def acquire(self) -> float:
+        """Wait for a free slot, returns the start time to pass to release"""
+        with self._condition:
+            while True:
+                pause = self._resume_at - time.monotonic()
+                if pause > 0:
+                    self._condition.wait(pause)
+                elif self.in_flight >= int(self.limit):
+                    self._condition.wait()
+                else:
+                    break
+            self.in_flight += 1
+            return time.monotonic()
+
+    def release(
+        self,
+        start: float,
+        statuses: Sequence[int],
+        latency: float = None,
+        retry_after: float = None,
+    ):
+        """Free the slot of a request and adapt the limit to how it went
+
+        statuses holds the status of the response and of all attempts that were retried,
+        None for a request that failed without a response.
+        """
+        with self._condition:
+            self.in_flight -= 1
+
+            throttled = any(
+                status is None or status in THROTTLE_STATUSES for status in statuses
+            )
+            if throttled:
+                # only the first of the requests that were in flight together decreases
+                if start >= self._last_decrease:
+                    self.limit = max(self.min_concurrency, self.limit * self.decrease)
+                    self._last_decrease = time.monotonic()
+                    self.record("decrease", statuses[-1], retry_after)
+            elif latency is not None:
+                if self.min_latency is None or latency < self.min_latency:
+                    self.min_latency = latency
+                if latency <= self.latency_factor * self.min_latency:
+                    previous, self.limit = self.limit, min(
+                        self.max_concurrency, self.limit + 1 / self.limit
+                    )
+                    if int(self.limit) > int(previous):
+                        self.record("increase", statuses[-1])
+
+            if retry_after:
+                self._resume_at = max(self._resume_at, time.monotonic() + retry_after)
+                self.record("retry_after", statuses[-1], retry_after)
+
+            self._condition.notify_all()
+
+    def record(self, event: str, status: int, retry_after: float = None):
+        self.events.append(
+            {
+                "time": time.time(),
+                "base_url": self.base_url,
+                "event": event,
+                "status": status,
+                "limit": int(self.limit),
+                "in_flight": self.in_flight,
+                "retry_after": retry_after,
+            }
+        )
+
+    @staticmethod
+    def parse_retry_after(value: str) -> float:
+        """Return the seconds to wait from a Retry-After header, in seconds or as a date"""
+        if not value:
+            return None
+        try:
+            return Retry().parse_retry_after(value)
+        except Exception:
+            return None
@@ -0,0 +1,100 @@
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Iterable, Iterator, Tuple
+
+Task = Tuple[Any, Callable[[], Any]]
+
+SCHEDULERS = ("serial", "threaded", "async")
+
+
+def round_robin(iterables: Iterable[Iterable]) -> Iterator:
+    """Take one item of each iterable in turn until all of them are exhausted"""
+    iterators = deque(iter(iterable) for iterable in iterables)
+    while iterators:
+        iterator = iterators.popleft()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            continue
+        yield item
+        iterators.append(iterator)
+
+
+def run_tasks(
+    tasks: Iterable[Task],
+    workers: int = 1,
+    on_result: Callable[[Any, Any], None] = None,
+    scheduler: str = None,
+):
+    """Run (key, task) pairs, calling task(), concurrently if workers > 1
+
+    Concurrent tasks run on a pool of workers, keeping at most 2 tasks per worker
+    queued, so tasks are taken from the iterable in order as workers become free.
+    on_result(key, result) is called from the calling thread per task.
+
+    The scheduler is one of SCHEDULERS, by default serial for a single worker and
+    threaded otherwise, see `run_tasks_async` for async.
+    """
+    if scheduler is None:
+        scheduler = "serial" if workers <= 1 else "threaded"
+    if scheduler not in SCHEDULERS:
+        raise ValueError(f"scheduler (={scheduler}) should be one of {SCHEDULERS}")
+    if scheduler == "async":
+        return run_tasks_async(tasks, workers, on_result)
+
+    if scheduler == "serial" or workers <= 1:
+        for key, task in tasks:
+            result = task()
+            if on_result is not None:
+                on_result(key, result)
+        return
+
+    def collect(futures):
+        for future in futures:
+            key, result = pending.pop(future), future.result()
+            if on_result is not None:
+                on_result(key, result)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+        try:
+            for key, task in tasks:
+                if len(pending) >= 2 * workers:
+                    collect(wait(pending, return_when=FIRST_COMPLETED).done)
+                pending[pool.submit(task)] = key
+
+            collect(wait(pending).done)
+        except BaseException:
+            # e.g. Ctrl-C, finish the tasks in flight but do not start queued ones
+            for future in pending:
+                future.cancel()
+            raise
+
+
+def run_tasks_async(
+    tasks: Iterable[Task],
+    workers: int = 1,
+    on_result: Callable[[Any, Any], None] = None,
+):
+    """Run (key, task) pairs from an asyncio event loop, at most `workers` at a time
+
+    Every worker is a coroutine taking the next task from the iterable once its
+    previous task is done. Tasks are blocking calls, so they run in a thread pool of
+    the same size. on_result(key, result) is called from the calling thread per task.
+    """
+
+    async def worker(iterator):
+        for key, task in iterator:
+            result = await asyncio.get_running_loop().run_in_executor(pool, task)
+            if on_result is not None:
+                on_result(key, result)
+
+    async def main():
+        iterator = iter(tasks)
+        await asyncio.gather(*(worker(iterator) for _ in range(max(workers, 1))))
+
+    # on e.g. Ctrl-C, asyncio.run cancels the workers and with them their executor
+    # futures, there is at most one task per thread so none of them is queued
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        asyncio.run(main())
@@ -1,17 +1,52 @@
 import yaml
-from input.inputelements import InteractiveInputs
-from results.response import HOLONErrorReponse, HOLONResponse
-import inspect
+from input.inputelements import InteractiveInputs, SweepSpace
+from input.sampling import Sampling, SampledSpace
+from input.adaptive import Adaptive, AdaptiveDesign, kpi_value
+from input.constraints import Constraints
+from results.response import (
+    HOLONErrorReponse,
+    HOLONResponse,
+    DASHBOARD_COLUMNS,
+    COST_BENEFIT_COLUMNS,
+)
+from execution.client import HOLONClient
+from execution.ratelimit import RateController, EVENT_COLUMNS, THROTTLE_STATUSES
+from execution.cache import ResultCache
+from execution.checkpoint import RunManifest
+from execution.progress import RunMonitor
+from execution.scheduler import run_tasks
+from execution.planning import merge_elements, point_key, previous_results, SKIP_REASONS
+from execution.planning import canonical_value
+from results.archive import ScenarioArchive, ARCHIVE_FILE
+from results.importer import ResultLoader
+from results.writer import INPUT_COLUMNS, ERROR_COLUMNS, TIMING_COLUMNS, open_sink, append_to_csv
+from results.writer import CONFIG_FILE, MANIFEST_FILE, SHARD_FILE, EVENTS_FILE, SKIPPED_FILE
+from results.writer import PROFILE_FILE, create_run_folder
+from results.health import phase_summary
 from pathlib import Path
-from itertools import product
-from typing import Iterable, Dict, List, Tuple, Union, Any
+from typing import Callable, Iterable, Iterator, Dict, List, Tuple, Union, Any
 import pandas as pd
 from uuid import uuid4
 import json
+import threading
+import time
+from functools import partial
 
 import requests as r
 
 ENDPOINT = "/wt/api/nextjs/v2/holon/"
+CACHE_FOLDER = ".holon_cache"
+
+
+def parse_shard(shard: str) -> Tuple[int, int]:
+    """Parse a shard "i/N" (1 <= i <= N) to a zero based (index, count) tuple"""
+    try:
+        index, count = (int(part) for part in shard.split("/"))
+    except ValueError:
+        raise ValueError(f"shard (={shard}) should be formatted as i/N, e.g. 1/4")
+    if not 1 <= index <= count:
+        raise ValueError(f"shard (={shard}) should be between 1/{count} and {count}/{count}")
+    return index - 1, count
 
 
 class Experiment:
@@ -26,32 +61,70 @@ class Experiment:
         base_url: str,
         disable_cache: bool = True,
         enable_sentry_logging: bool = True,
+        http: Dict[str, Any] = None,
+        sampling: Dict[str, Any] = None,
+        adaptive: Dict[str, Any] = None,
+        constraints: List[str] = None,
     ) -> None:
+        # kept to store a copy of the experiment definition with its outputs
+        self.config = {
+            "scenario_id": scenario_id,
+            "title": title,
+            "description": description,
+            "interactive_inputs": interactive_inputs,
+            "base_url": base_url,
+            "http": http,
+            "sampling": sampling,
+            "adaptive": adaptive,
+            "constraints": constraints,
+        }
         self.scenario_id = scenario_id
         self.title = title
         self.description = description
         self.interactive_inputs = InteractiveInputs(**interactive_inputs)
+        self.sampling = None if sampling is None else Sampling(**sampling)
+        self.adaptive = None if adaptive is None else Adaptive(**adaptive)
+        if self.sampling is not None and self.adaptive is not None:
+            raise ValueError("An experiment can either use sampling or be adaptive, not both")
+        self.constraints = Constraints(constraints or [], self.input_names)
+        if self.constraints and self.adaptive is not None:
+            raise ValueError("Adaptive experiments cannot have constraints")
         self.base_url = base_url
         self.disable_cache = disable_cache
         self.enable_sentry_logging = enable_sentry_logging
-
-        self._results = []
-        self._inputs = []
-        self._cost_benefit = []
-        self._errors = {}
+        self.http = http or {}
+        self.client: HOLONClient = None
+        self.controller: RateController = None
+        self.cache: ResultCache = None
+        self.cache_errors: bool = False
+        self.manifest: RunManifest = None
+        self.sink = None
+        self.archive: ScenarioArchive = None
+        self.monitor: RunMonitor = None
+        self.skipped: Dict[int, Tuple[str, str]] = {}
+        self.experiment_folder: Path = None
+        self.config_path: Path = None
+        self.run_options: Dict[str, Any] = {}
+        self.session_start: float = None
+
+        self._lock = threading.Lock()
         self._sweep_set: Iterable = None
-        self._single_sweep: bool = False
+        self._sweep_space: Union[SweepSpace, SampledSpace] = None
+
+        if self.sampling is not None:
+            self.sweep_space  # draws the samples, raises if there are more than points
+        if self.adaptive is not None:
+            coarse = len(AdaptiveDesign(self.sweep_space, self.adaptive).initial())
+            if self.adaptive.budget < coarse:
+                raise ValueError(
+                    f"budget (={self.adaptive.budget}) must be at least the {coarse} points "
+                    "of the coarse design, lower initial_points or raise the budget"
+                )
 
     @property
     def current_sweep(self):
         """Return the current sweep set as a list of dicts"""
-        if self._single_sweep == True:
-            raise StopIteration
-        if self.interactive_inputs.sweep is None:
-            self._single_sweep = True
-            return []
-        else:
-            return [ie.to_json() for ie in next(self.sweep_set)]
+        return [ie.to_json() for ie in next(self.sweep_set)]
 
     @property
     def base(self):
@@ -60,50 +133,238 @@ class Experiment:
             return []
         return [ie.to_json() for ie in self.interactive_inputs.base.values()]
 
+    @property
+    def outputs_folder(self) -> Path:
+        """Return the folder with the outputs of all experiments next to the yaml file"""
+        return self.config_path.parent / "experiment_outputs"
+
+    @property
+    def input_names(self) -> List[str]:
+        """Return the names of the base and sweep elements, as used by constraints"""
+        return [*(self.interactive_inputs.base or {}), *(self.interactive_inputs.sweep or {})]
+
+    @property
+    def sweep_space(self) -> Union[SweepSpace, SampledSpace]:
+        """Return the indexable space of all points of the experiment
+
+        With a sampling block, only the sampled points instead of all combinations
+        """
+        if self._sweep_space is None:
+            self._sweep_space = self.interactive_inputs.sweep_space
+            if self.sampling is not None and self.interactive_inputs.sweep is not None:
+                self._sweep_space = SampledSpace(self._sweep_space, self.sampling)
+        return self._sweep_space
+
     @property
     def sweep_set(self):
-        """Return the sweep set as an iterable of tuples of values"""
+        """Return the sweep set as an iterator of tuples of values"""
         if self._sweep_set is None:
-            self._sweep_set = product(*self.interactive_inputs.sweep.values())
+            self._sweep_set = iter(self.sweep_space)
         return self._sweep_set
 
     @property
     def results(self):
         """Return results as a pandas dataframe"""
-        return pd.concat(self._results)
+        return self.read_table("results", DASHBOARD_COLUMNS)
 
     @property
     def inputs(self):
         """Return inputs as a pandas dataframe"""
-        return pd.concat(self._inputs)
+        return self.read_table("inputs", INPUT_COLUMNS)
 
     @property
     def cost_benefit(self):
         """Return cost benifit as a pandas dataframe"""
-        return pd.concat(self._cost_benefit)
+        return self.read_table("cost_benefit", COST_BENEFIT_COLUMNS)
 
     @property
     def errors(self):
         """Return errors as a pandas dataframe"""
-        return pd.DataFrame.from_dict(self._errors, orient="index", columns=["error_msg"])
+        return self.read_table("errors", ERROR_COLUMNS)
+
+    @property
+    def timings(self):
+        """Return the request timings (in seconds) per uuid as a pandas dataframe"""
+        return self.read_table("timings", TIMING_COLUMNS)
+
+    def read_table(self, table: str, columns: List[str]) -> pd.DataFrame:
+        """Read a table of the run back from its output folder
+
+        Results are not kept in memory, so the tables hold all points of the run, also
+        those of earlier sessions of a resumed run. Rows buffered by the parquet sink are
+        on disk once the run finishes.
+        """
+        df = None
+        if self.experiment_folder is not None:
+            df = ResultLoader.load_table(self.experiment_folder, table)
+        if df is None or df.columns.empty:
+            return pd.DataFrame(columns=columns)
+        return df
+
+    @classmethod
+    def load_from_yaml(cls, file_path: Union[str, Path] = "experiment.yaml"):
+        """Load an experiment from a yaml file, relative paths are relative to the working directory
+
+        Outputs and the local cache of the experiment are stored next to the yaml file.
+        """
+        config_path = Path(file_path).resolve()
+        with open(config_path, "r") as f:
+            experiment = cls(**yaml.safe_load(f))
+        experiment.config_path = config_path
+        return experiment
 
     @classmethod
-    def load_from_yaml(self, relative_file_path: str = "experiment.yaml"):
-        """Load an experiment from a yaml file"""
-        # resolve filepath using pathlib as relative import to call location
-        self.config_path = Path(inspect.stack()[1].filename).parent / relative_file_path
-        with open(self.config_path, "r") as f:
-            experiment = yaml.safe_load(f)
-        return Experiment(**experiment)
+    def load_from_folder(cls, experiment_folder: Union[str, Path]):
+        """Load an experiment from the definition stored in one of its output folders"""
+        experiment_folder = Path(experiment_folder).resolve()
+        with open(experiment_folder / CONFIG_FILE, "r") as f:
+            experiment = cls(**yaml.safe_load(f))
+        # outputs live in <config folder>/experiment_outputs/<title>/<timestamp>
+        experiment.config_path = experiment_folder.parents[2] / CONFIG_FILE
+        return experiment
+
+    @classmethod
+    def resume(cls, experiment_folder: Union[str, Path], **kwargs):
+        """Resume an interrupted run in its output folder, running only the missing points"""
+        experiment = cls.load_from_folder(experiment_folder)
+        experiment.run(experiment_folder=experiment_folder, **kwargs)
+        return experiment
+
+    @staticmethod
+    def interactive_to_records(interactive_inputs: List[Dict[str, Any]], uuid: str):
+        """Convert interactive elements to (uuid, id, value) rows"""
+        return [(uuid, ie["interactive_element"], ie["value"]) for ie in interactive_inputs]
 
     def interactive_to_df(self, interactive_inputs: List[Dict[str, Any]], uuid: str):
-        df = pd.DataFrame(columns=["uuid", "id", "value"])
-        for ie in interactive_inputs:
-            df.loc[len(df)] = [uuid, ie["interactive_element"], ie["value"]]
-        return df
+        return pd.DataFrame.from_records(
+            self.interactive_to_records(interactive_inputs, uuid), columns=INPUT_COLUMNS
+        )
 
-    def post(self):
-        """Post the current set of inputs to the HOLON API"""
+    def point(self, index: int) -> List[Dict[str, Any]]:
+        """Return the interactive elements of the point at index in the sweep space
+
+        A sweep element overrides a base element with the same id.
+        """
+        return merge_elements([*self.base, *(ie.to_json() for ie in self.sweep_space[index])])
+
+    def point_values(self, index: int) -> Dict[str, Any]:
+        """Return the values of the base and sweep elements of a point by name"""
+        values = {name: ie.value for name, ie in (self.interactive_inputs.base or {}).items()}
+        sweep = self.interactive_inputs.sweep or {}
+        values.update((name, ie.value) for name, ie in zip(sweep, self.sweep_space[index]))
+        return values
+
+    @property
+    def may_have_duplicates(self) -> bool:
+        """Whether points can have the same inputs, i.e. sweeps share an id or repeat a value"""
+        sweeps = list((self.interactive_inputs.sweep or {}).values())
+        if len({sweep.id for sweep in sweeps}) < len(sweeps):
+            return True
+        for sweep in sweeps:
+            values = [canonical_value(ie.value) for ie in sweep]
+            if len(set(values)) < len(values):
+                return True
+        return False
+
+    def plan(self, previous: Dict[str, str] = None) -> Dict[int, Tuple[str, str]]:
+        """Return the points that should not be posted as {index: (reason, duplicate of)}
+
+        A point is skipped if one of the constraints holds for it ("constraint"), if an
+        earlier point has the same inputs ("duplicate" of its index) or if its inputs are
+        in previous, a mapping of keys to results of earlier runs ("previous_run").
+        All points are planned, so every shard and resumed run skips the same points.
+        Without constraints, previous results or possible duplicates nothing is planned.
+        """
+        if not (self.constraints or previous or self.may_have_duplicates):
+            return {}
+        skipped = {}
+        seen = {}
+        for index in range(len(self.sweep_space)):
+            if self.constraints and self.constraints.skip(self.point_values(index)):
+                skipped[index] = ("constraint", None)
+                continue
+            key = point_key(self.base_url, self.scenario_id, self.point(index))
+            if key in seen:
+                skipped[index] = ("duplicate", str(seen[key]))
+            elif previous and key in previous:
+                skipped[index] = ("previous_run", previous[key])
+            else:
+                seen[key] = index
+        return skipped
+
+    def write_skipped(self, indices: range):
+        """Write the skipped points of the run (within indices) to skipped.jsonl"""
+        with open(self.experiment_folder / SKIPPED_FILE, "w") as f:
+            for index, (reason, duplicate_of) in sorted(self.skipped.items()):
+                if index in indices:
+                    entry = {"point": index, "reason": reason, "duplicate_of": duplicate_of}
+                    f.write(json.dumps(entry) + "\n")
+
+    def skip_counts(self, indices: range) -> Dict[str, int]:
+        """Count the skipped points (within indices) per reason"""
+        counts = dict.fromkeys(SKIP_REASONS, 0)
+        for index, (reason, _) in self.skipped.items():
+            if index in indices:
+                counts[reason] += 1
+        return counts
+
+    def count_points(
+        self,
+        shard: str = None,
+        experiment_folder: Union[str, Path] = None,
+        skip_previous_runs: bool = False,
+    ) -> Dict[str, int]:
+        """Count the points a run would post, without posting or writing anything
+
+        Returns the number of points of the experiment, of the shard, skipped per reason,
+        already done in experiment_folder (when resuming) and left to run.
+        """
+        if experiment_folder is not None:
+            experiment_folder = Path(experiment_folder)
+            if shard is None and (experiment_folder / SHARD_FILE).exists():
+                with open(experiment_folder / SHARD_FILE, "r") as f:
+                    shard = json.load(f)["shard"]
+        if self.adaptive is not None:
+            size = len(self.sweep_space)
+            return {"points": size, "to_run": min(self.adaptive.budget, size)}
+
+        indices = self.shard_points(shard)
+        previous = None
+        if skip_previous_runs:
+            previous = previous_results(self.outputs_folder, exclude=experiment_folder)
+        self.skipped = self.plan(previous)
+        skipped = self.skip_counts(indices)
+        done = set()
+        if experiment_folder is not None:
+            done = RunManifest(experiment_folder / MANIFEST_FILE).done()
+        done = sum(index in indices and index not in self.skipped for index in done)
+        counts = {"points": len(self.sweep_space), "shard": len(indices)}
+        counts.update({f"skipped_{reason}": count for reason, count in skipped.items()})
+        counts.update(done=done, to_run=len(indices) - sum(skipped.values()) - done)
+        return counts
+
+    def points(self, skip: Iterable[int] = (), shard: str = None):
+        """Yield the index and interactive elements of every point not in skip
+
+        With a shard "i/N", only every N-th point starting at point i - 1 is yielded, so
+        N shards together cover all points.
+        """
+        skip = set(skip)
+        for index in self.shard_points(shard):
+            if index not in skip:
+                yield index, self.point(index)
+
+    def shard_points(self, shard: str = None) -> range:
+        """The indices of the points of a shard "i/N", or of all points without a shard"""
+        start, step = (0, 1) if shard is None else parse_shard(shard)
+        return range(start, len(self.sweep_space), step)
+
+    def open_client(self, pool_size: int = 10, max_concurrency: int = None):
+        """Open a pooled HTTP client, options from the `http` block override the defaults
+
+        Requests go through an AIMD rate controller that allows at most max_concurrency
+        requests in flight, configured with the `rate_limit` options of the `http` block.
+        """
 
         if self.disable_cache:
             cookies = {"caching": "false"}
@@ -115,88 +376,424 @@ class Experiment:
         else:
             params = {"sentry_logging": False}
 
-        interactive_elements = [
-            *self.base,
-            *self.current_sweep,
-        ]
+        http = dict(self.http)
+        self.controller = RateController(
+            max_concurrency=max_concurrency or pool_size,
+            base_url=self.base_url,
+            **http.pop("rate_limit", {}),
+        )
+        self.client = HOLONClient(
+            self.base_url, controller=self.controller, **{"pool_size": pool_size, **http}
+        )
+        self.client.configure(cookies, params)
+        return self.client
 
-        response = r.post(
-            url=self.base_url + ENDPOINT,
-            json={
+    def post(self, interactive_elements: List[Dict[str, Any]] = None):
+        """Post a set of inputs (defaults to the next point) to the HOLON API"""
+
+        if self.client is None:
+            self.open_client()
+
+        if interactive_elements is None:
+            interactive_elements = merge_elements([*self.base, *self.current_sweep])
+
+        response, timing = self.client.post(
+            ENDPOINT,
+            {
                 "interactive_elements": interactive_elements,
                 "scenario": self.scenario_id,
             },
-            cookies=cookies,
-            params=params,
         )
 
-        return response, interactive_elements
+        return response, interactive_elements, timing
 
     def store_results(
         self,
         result: Union[HOLONResponse, HOLONErrorReponse],
         interactive_elements: List[Dict[str, Any]],
+        timing: Dict[str, float] = None,
+        point: int = None,
+        status: str = "ok",
     ):
-        """Store the results of a single point"""
+        """Store the results of a single point, safe to call from multiple workers
+
+        The results are handed to the sink of the run, which records the point with its
+        status (ok, error or failed) in the manifest once they are on disk, so an
+        interrupted run can be resumed. Returns the uuid of the point.
+        """
         uuid = str(uuid4())
 
-        # Both cases have inputs and an scenario file
-        result.write_scenario(self.scenario_folder, uuid)
-        self._inputs.append(self.interactive_to_df(interactive_elements, uuid))
+        # Both cases have inputs and an scenario file, files are unique per uuid
+        result.archive_scenario(self.archive, uuid)
+        inputs = self.interactive_to_records(interactive_elements, uuid)
 
         if isinstance(result, HOLONResponse):
             # only if the result is a success do we have dashboard and cost benefit results
-            self._results.append(result.dashboard_results.to_pandas(uuid))
-            self._cost_benefit.append(result.cost_benefit_results.to_pandas(uuid))
+            results = result.dashboard_results.to_records(uuid)
+            cost_benefit = result.cost_benefit_results.to_records(uuid)
         else:
             # if error, error message & anylogic response JSON
-            result.write_anylogic(self.anylogic_folder, uuid)
-            self._errors.update({uuid: result.error_msg})
+            result.archive_anylogic(self.archive, uuid)
 
-    def initiate_experiment(self):
-        """creates a folder for the experiment and subfolders for anylogic and scenario files"""
+        tables = {"inputs": inputs}
+        if isinstance(result, HOLONResponse):
+            tables.update(results=results, cost_benefit=cost_benefit)
+        else:
+            tables.update(errors=[(uuid, result.error_msg)])
+        if timing is not None:
+            tables.update(timings=[(uuid, *(timing[column] for column in TIMING_COLUMNS))])
 
-        timestamp = pd.Timestamp.now().strftime("%Y%m%d_%H%M%S")
+        entry = None
+        if point is not None:
+            key = point_key(self.base_url, self.scenario_id, interactive_elements)
+            entry = (point, uuid, status, key)
 
-        self.experiment_folder = (
-            self.config_path.parent / "experiment_outputs" / f"{self.title}" / f"{timestamp}"
-        )
-        self.scenario_folder = self.experiment_folder / "scenario"
-        self.anylogic_folder = self.experiment_folder / "anylogic"
-        self.experiment_folder.mkdir(parents=True, exist_ok=True)
-        self.scenario_folder.mkdir(parents=True, exist_ok=True)
-        self.anylogic_folder.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self.sink.write(tables, entry)
+        return uuid
 
-    def run_point(self):
-        """Run a single point of the experiment, i.e. a single set of inputs"""
+    def initiate_experiment(
+        self, experiment_folder: Union[str, Path] = None, output_format: str = None
+    ):
+        """creates a folder for the experiment with an archive for anylogic and scenario files
 
-        response, interactive_elements = self.post()
+        If an existing experiment folder is passed, it is reopened to resume the run. Its
+        output format is used unless another one is given.
+        """
 
-        if response.status_code == 200:
-            result = HOLONResponse(**response.json())
+        if experiment_folder is None:
+            self.experiment_folder = create_run_folder(self.outputs_folder / f"{self.title}")
         else:
-            result = HOLONErrorReponse(**response.json())
+            self.experiment_folder = Path(experiment_folder)
+            self.experiment_folder.mkdir(parents=True, exist_ok=True)
+        self.archive = ScenarioArchive(self.experiment_folder / ARCHIVE_FILE)
+
+        if not (self.experiment_folder / CONFIG_FILE).exists():
+            with open(self.experiment_folder / CONFIG_FILE, "w") as f:
+                yaml.safe_dump(self.config, f, sort_keys=False)
+        self.manifest = RunManifest(self.experiment_folder / MANIFEST_FILE)
+        self.sink = open_sink(self.experiment_folder, self.manifest, output_format)
+
+    def initiate_shard(self, shard: str = None):
+        """Record the shard of the run in its folder, or read it back when resuming"""
+        shard_path = self.experiment_folder / SHARD_FILE
+        if shard is None and shard_path.exists():
+            with open(shard_path, "r") as f:
+                shard = json.load(f)["shard"]
+
+        if shard is not None:
+            parse_shard(shard)
+            with open(shard_path, "w") as f:
+                json.dump({"shard": shard}, f)
+        return shard
+
+    def run_point(self, interactive_elements: List[Dict[str, Any]] = None, point: int = None):
+        """Run a single point of the experiment, i.e. a single set of inputs
+
+        If a local cache is enabled, a cached result skips the request to the HOLON API.
+        The time spent per phase of the point is reported to the monitor of the run.
+        """
+
+        if interactive_elements is None:
+            interactive_elements = merge_elements([*self.base, *self.current_sweep])
+
+        if self.cache is not None:
+            key = self.cache.key(self.base_url, self.scenario_id, interactive_elements)
+            result = self.cache.get(key)
+            if result is not None:
+                self.store_and_report(result, interactive_elements, point=point, cached=True)
+                return result
 
-        self.store_results(result, interactive_elements)
+        try:
+            response, interactive_elements, timing = self.post(interactive_elements)
+        except r.RequestException as e:
+            # e.g. a timeout or a connection error that persisted after the retries
+            result = HOLONErrorReponse(
+                error_msg=f"request failed: {e}", scenario={}, anylogic_outcomes=None
+            )
+            self.store_and_report(result, interactive_elements, point=point, failed=True)
+            return result
+
+        start = time.perf_counter()
+        result = self.parse_response(response)
+        phases = {**timing, "post": timing["total"], "parse": time.perf_counter() - start}
+
+        # throttling or a gateway error that persisted after the retries, not a result
+        failed = response.status_code in THROTTLE_STATUSES
+        if self.cache is not None and not failed:
+            if isinstance(result, HOLONResponse) or self.cache_errors:
+                self.cache.put(key, result)
+
+        self.store_and_report(
+            result, interactive_elements, timing, point, phases=phases, failed=failed
+        )
+        return result
+
+    def store_and_report(
+        self,
+        result: Union[HOLONResponse, HOLONErrorReponse],
+        interactive_elements: List[Dict[str, Any]],
+        timing: Dict[str, float] = None,
+        point: int = None,
+        phases: Dict[str, float] = None,
+        cached: bool = False,
+        failed: bool = False,
+    ):
+        """Store the results of a point and report its phase timings to the monitor
+
+        Failed points, i.e. requests that failed or kept being throttled, are stored as
+        errors but are run again when the run is resumed.
+        """
+        status = "ok" if isinstance(result, HOLONResponse) else "error"
+        if failed:
+            status = "failed"
+        start = time.perf_counter()
+        uuid = self.store_results(result, interactive_elements, timing, point, status)
+        if self.monitor is not None:
+            phases = {**(phases or {}), "store": time.perf_counter() - start}
+            self.monitor.point(point, uuid, status, phases, cached)
+
+    @staticmethod
+    def parse_response(response: r.Response) -> Union[HOLONResponse, HOLONErrorReponse]:
+        """Parse a response, a body that is not the expected JSON becomes an error result
+
+        Only the results of a response are validated, the scenario is taken as is.
+        """
+        try:
+            if response.status_code == 200:
+                return HOLONResponse.from_json(response.content)
+            return HOLONErrorReponse.from_json(response.content)
+        except (ValueError, TypeError):
+            # invalid JSON or a body that does not validate, e.g. an HTML error page
+            return HOLONErrorReponse(
+                error_msg=f"status {response.status_code}: {response.text[:1000]}",
+                scenario={},
+                anylogic_outcomes=None,
+            )
+
+    def write_throttling_events(self):
+        """Append the events of the rate controller to throttling.csv"""
+        rows = [
+            tuple(event[column] for column in EVENT_COLUMNS) for event in self.controller.events
+        ]
+        if rows:
+            append_to_csv(rows, EVENT_COLUMNS, self.experiment_folder / "throttling.csv")
+
+    def write_profile(self):
+        """Write the options, point counts and phase timings of this session to profile.json
+
+        A resumed run overwrites the profile of its previous session.
+        """
+        path = self.experiment_folder / EVENTS_FILE
+        events = pd.DataFrame()
+        if path.exists() and path.stat().st_size:
+            events = pd.read_json(path, lines=True, convert_dates=False)
+            events = events[events.time >= self.session_start]
+        wall_time = time.time() - self.session_start
+
+        profile = {
+            "experiment": self.title,
+            "started": pd.Timestamp(self.session_start, unit="s").isoformat(),
+            "wall_time_s": wall_time,
+            "options": self.run_options,
+            "points": {
+                "total": self.monitor.total,
+                "done_before": self.monitor.done,
+                "completed": self.monitor.completed,
+                "cached": self.monitor.cached,
+                "errors": self.monitor.errors,
+                "skipped": self.skip_counts(self.shard_points(self.run_options["shard"])),
+            },
+            "points_per_min": 60 * self.monitor.completed / wall_time,
+            "phases": phase_summary(events),
+            "throttling_events": len(self.controller.events),
+        }
+        if self.cache is not None:
+            profile["cache"] = {"hits": self.cache.hits, "misses": self.cache.misses}
+        with open(self.experiment_folder / PROFILE_FILE, "w") as f:
+            json.dump(profile, f, indent=2)
 
     def write_results_to_csv(self):
-        """Write the results to csv files"""
-        self.results.to_csv(self.experiment_folder / "results.csv")
-        self.inputs.to_csv(self.experiment_folder / "inputs.csv")
-        self.cost_benefit.to_csv(self.experiment_folder / "cost_benefit.csv")
-        self.errors.to_csv(self.experiment_folder / "errors.csv")
-
-    def run(self, disable_caching: bool = True, enable_sentry_logging: bool = True):
-        """Run the experiment, i.e. all points"""
+        """Write the tables of a parquet run to csv files, `run` writes csv runs per point
+
+        Tables are converted in chunks, so they do not have to fit in memory.
+        """
+        folder = self.experiment_folder
+        loader = ResultLoader(folder.parent.parent)
+        for table in ["results", "inputs", "cost_benefit", "errors", "timings"]:
+            path = folder / f"{table}.csv"
+            if path.exists():
+                continue
+            for chunk in loader.iter_table(folder.parent.name, folder.name, table):
+                chunk.to_csv(path, mode="a", header=not path.exists())
+
+    def run_points(
+        self,
+        points: Iterable[Tuple[int, List[Dict[str, Any]]]],
+        workers: int = 1,
+        on_result: Callable[[int, Union[HOLONResponse, HOLONErrorReponse]], None] = None,
+        scheduler: str = None,
+    ):
+        """Run (index, interactive elements) points, concurrently if workers > 1
+
+        Concurrent points run on a pool of workers, keeping at most 2 points per worker
+        queued. on_result(index, result) is called from the calling thread per point.
+        The scheduler is serial, threaded or async, see `execution.scheduler`.
+        """
+        tasks = (
+            (point, partial(self.run_point, interactive_elements, point))
+            for point, interactive_elements in points
+        )
+        run_tasks(tasks, workers, on_result, scheduler)
+
+    def run_adaptive(self, workers: int = 1, scheduler: str = None):
+        """Run an adaptive sweep, refining in rounds of one point per worker"""
+        space = self.sweep_space
+        design = AdaptiveDesign(space, self.adaptive)
+
+        def on_result(point, result):
+            design.update(space.unravel(point), kpi_value(result, self.adaptive.kpi))
+
+        batch = design.initial()
+        while batch:
+            points = [space.ravel(indices) for indices in batch]
+            points = ((point, self.point(point)) for point in points)
+            self.run_points(points, workers, on_result, scheduler)
+            batch = design.refine(max(workers, 1))
+
+        print(f"Adaptive sweep finished after {len(design.values)} points")
+
+    def run(
+        self,
+        disable_caching: bool = True,
+        enable_sentry_logging: bool = True,
+        workers: int = 1,  # points in flight
+        local_cache: bool = False,  # cache results on disk next to the experiment yaml
+        cache_errors: bool = False,  # also cache error responses of HOLON
+        experiment_folder: Union[str, Path] = None,  # output folder of a run to resume
+        output_format: str = None,  # "csv" (default) or "parquet"
+        shard: str = None,  # "i/N", only run a deterministic 1/N-th of the points
+        skip_previous_runs: bool = False,  # skip points an earlier run already stored
+        scheduler: str = None,  # "serial", "threaded" or "async", see run_tasks
+    ):
+        """Run all points of the experiment, or its adaptive design, see the README"""
+        points = self.start(
+            disable_caching,
+            enable_sentry_logging,
+            workers,
+            local_cache,
+            cache_errors,
+            experiment_folder,
+            output_format,
+            shard,
+            skip_previous_runs=skip_previous_runs,
+            scheduler=scheduler,
+        )
+        try:
+            if self.adaptive is not None:
+                self.run_adaptive(workers, scheduler)
+            else:
+                self.run_points(points, workers, scheduler=scheduler)
+        finally:
+            self.finish()
+
+    def start(
+        self,
+        disable_caching: bool = True,
+        enable_sentry_logging: bool = True,
+        workers: int = 1,
+        local_cache: bool = False,
+        cache_errors: bool = False,
+        experiment_folder: Union[str, Path] = None,
+        output_format: str = None,
+        shard: str = None,
+        inline_progress: bool = None,
+        skip_previous_runs: bool = False,
+        scheduler: str = None,
+    ) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+        """Prepare a run (see `run`) and return the points that are left to run
+
+        Call `finish` when the points have been run. With inline_progress=False, the
+        progress is printed as separate lines instead of redrawn on a terminal.
+        """
+        if self.adaptive is not None:
+            if shard is not None:
+                raise ValueError("Adaptive experiments cannot be sharded")
+            if experiment_folder is not None:
+                if RunManifest(Path(experiment_folder) / MANIFEST_FILE).done():
+                    raise ValueError("Adaptive experiments cannot be resumed")
+
+        self.session_start = time.time()
+        self.run_options = {
+            "scheduler": scheduler or ("serial" if workers <= 1 else "threaded"),
+            "workers": workers,
+            "disable_caching": disable_caching,
+            "enable_sentry_logging": enable_sentry_logging,
+            "local_cache": local_cache,
+            "cache_errors": cache_errors,
+            "output_format": output_format,
+            "shard": shard,
+            "skip_previous_runs": skip_previous_runs,
+        }
         self.disable_cache = disable_caching
         self.enable_sentry_logging = enable_sentry_logging
-        print(f"Starting experiment {self.title}")
-        self.initiate_experiment()
-        try:
-            while True:
-                print("Running point")
-                self.run_point()
-        except StopIteration:
-            print("Finished experiment")
-
-        self.write_results_to_csv()
\ No newline at end of file
+        self.cache_errors = cache_errors
+        if local_cache:
+            self.cache = ResultCache(self.config_path.parent / CACHE_FOLDER)
+        if self.adaptive is not None:
+            size = f"adaptive, at most {self.adaptive.budget} of {len(self.sweep_space)} points"
+        else:
+            size = f"{len(self.sweep_space)} points"
+        print(f"Starting experiment {self.title} ({size})")
+        self.initiate_experiment(experiment_folder, output_format)
+        shard = self.initiate_shard(shard)
+        self.run_options.update(shard=shard, output_format=self.sink.output_format)
+        if shard is not None:
+            print(f"Running shard {shard}")
+        done = self.manifest.done()
+        if done:
+            print(f"Resuming, {len(done)} points already done")
+        self.open_client(pool_size=max(workers, 10), max_concurrency=workers)
+        if self.adaptive is not None:
+            self.monitor = RunMonitor(
+                self.experiment_folder / EVENTS_FILE,
+                total=min(self.adaptive.budget, len(self.sweep_space)),
+                label=self.title,
+                inline=inline_progress,
+            )
+            return None
+
+        indices = self.shard_points(shard)
+        previous = None
+        if skip_previous_runs:
+            previous = previous_results(self.outputs_folder, exclude=self.experiment_folder)
+        self.skipped = self.plan(previous)
+        self.write_skipped(indices)
+        skipped = {index for index in self.skipped if index in indices}
+        if skipped:
+            reasons = self.skip_counts(indices)
+            counts = ", ".join(f"{count} {reason}" for reason, count in reasons.items() if count)
+            print(f"Skipping {len(skipped)} points ({counts})")
+
+        self.monitor = RunMonitor(
+            self.experiment_folder / EVENTS_FILE,
+            total=len(indices) - len(skipped),
+            done=sum(index in indices for index in done - skipped),
+            label=self.title,
+            inline=inline_progress,
+        )
+        return self.points(skip=done | skipped, shard=shard)
+
+    def finish(self):
+        """Close the client, outputs and archive of a run and report on it"""
+        self.monitor.close()
+        self.client.close()
+        self.write_throttling_events()
+        self.sink.close()
+        self.archive.close()
+        self.write_profile()
+        if self.cache is not None:
+            hits = f"{self.cache.hits} cache hits, {self.cache.misses} misses"
+            print(f"Finished experiment {self.title} ({hits})")
+        else:
+            print(f"Finished experiment {self.title}")
@@ -5,4 +5,7 @@ from .inputelements import (
     ContinousInteractiveElement,
     DiscreteInteractiveElementSweep,
     ContinousInteractiveElementSweep,
+    SweepSpace,
 )
+from .sampling import Sampling, SampledSpace
+from .adaptive import Adaptive, AdaptiveDesign
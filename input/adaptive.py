@@ -0,0 +1,133 @@
+from pydantic import BaseModel, validator
+from typing import Dict, List, Tuple, Union
+from itertools import product
+import math
+
+import numpy as np
+
+from .inputelements import ContinousInteractiveElementSweep, SweepSpace
+from results.response import (
+    DashboardResults,
+    DashboardResultSet,
+    HOLONErrorReponse,
+    HOLONResponse,
+)
+
+Indices = Tuple[int, ...]
+
+
+class Adaptive(BaseModel):
+    """Class to represent the settings of an adaptive sweep
+
+    The sweep starts from a coarse design and keeps bisecting the intervals between
+    neighbouring points of continuous sweeps with the largest change in `kpi`, until the
+    budget of points is spent or no change is larger than the tolerance.
+    """
+
+    kpi: str  # <level>.<kpi>, e.g. local.costs or national.self_sufficiency
+    budget: int
+    tolerance: float = 0.0
+    initial_points: int = 3  # per continuous sweep, discrete sweeps use all options
+
+    @validator("kpi")
+    def kpi_must_exist(cls, v):
+        level, _, kpi = v.partition(".")
+        if (
+            level not in DashboardResults.__fields__
+            or kpi not in DashboardResultSet.__fields__
+        ):
+            raise ValueError(
+                f"kpi (={v}) must be <level>.<kpi> with level in "
+                f"{list(DashboardResults.__fields__)} and kpi in "
+                f"{list(DashboardResultSet.__fields__)}"
+            )
+        return v
+
+    @validator("initial_points")
+    def initial_points_must_include_bounds(cls, v):
+        if v < 2:
+            raise ValueError(f"initial_points (={v}) must be at least 2")
+        return v
+
+
+def kpi_value(result: Union[HOLONResponse, HOLONErrorReponse], kpi: str) -> float:
+    """Return the value of a <level>.<kpi> of a result, nan for an error"""
+    if not isinstance(result, HOLONResponse):
+        return math.nan
+    level, _, name = kpi.partition(".")
+    return getattr(getattr(result.dashboard_results, level), name)
+
+
+class AdaptiveDesign:
+    """Class to keep track of the points of an adaptive sweep over a sweep space
+
+    Points are identified by their index into every sweep. Only continuous sweeps are
+    refined, discrete sweeps are fully enumerated in the coarse design.
+    """
+
+    def __init__(self, space: SweepSpace, adaptive: Adaptive) -> None:
+        self.space = space
+        self.adaptive = adaptive
+        self.values: Dict[Indices, float] = {}
+        self.continuous = [
+            dimension
+            for dimension, sweep in enumerate(space.sweeps)
+            if isinstance(sweep, ContinousInteractiveElementSweep)
+        ]
+
+    def initial(self) -> List[Indices]:
+        """Return the points of the coarse design"""
+        axes = []
+        for dimension, size in enumerate(self.space.shape):
+            if dimension in self.continuous:
+                axis = np.linspace(0, size - 1, min(self.adaptive.initial_points, size))
+                axes.append(sorted({int(round(i)) for i in axis}))
+            else:
+                axes.append(range(size))
+        return list(product(*axes))
+
+    def update(self, indices: Indices, value: float):
+        """Record the kpi value of an evaluated point"""
+        self.values[indices] = value
+
+    def intervals(self) -> List[Tuple[float, Indices]]:
+        """Return (change in kpi, midpoint) of every interval that can still be bisected
+
+        Intervals lie between neighbouring evaluated points along a continuous sweep,
+        with all other sweeps equal. Intervals next to errors are not refined.
+        """
+        intervals = []
+        for dimension in self.continuous:
+            lines: Dict[Indices, List[Tuple[int, float]]] = {}
+            for indices, value in self.values.items():
+                line = indices[:dimension] + indices[dimension + 1 :]
+                lines.setdefault(line, []).append((indices[dimension], value))
+
+            for line, points in lines.items():
+                points.sort()
+                for (lower, lower_value), (upper, upper_value) in zip(
+                    points, points[1:]
+                ):
+                    change = abs(upper_value - lower_value)
+                    if upper - lower < 2 or math.isnan(change):
+                        continue
+                    midpoint = (
+                        line[:dimension] + ((lower + upper) // 2,) + line[dimension:]
+                    )
+                    intervals.append((change, midpoint))
+
+        return sorted(intervals, reverse=True)
+
+    def refine(self, batch: int) -> List[Indices]:
+        """Return up to batch new points that bisect the intervals with the largest change"""
+        remaining = self.adaptive.budget - len(self.values)
+        points = []
+        for change, midpoint in self.intervals():
+            if (
+                len(points) >= min(batch, remaining)
+                or change <= self.adaptive.tolerance
+            ):
+                break
+            if midpoint not in self.values and midpoint not in points:
+                points.append(midpoint)
+        return points
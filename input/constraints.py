@@ -0,0 +1,92 @@
+import ast
+from typing import Any, Dict, Iterable, List
+
+# the syntax a constraint may use, anything else (calls, attributes, subscripts,
+# lambdas, ...) is rejected before the expression is compiled
+ALLOWED_NODES = (
+    ast.Expression,
+    ast.BoolOp,
+    ast.And,
+    ast.Or,
+    ast.UnaryOp,
+    ast.Not,
+    ast.USub,
+    ast.UAdd,
+    ast.Compare,
+    ast.Eq,
+    ast.NotEq,
+    ast.Lt,
+    ast.LtE,
+    ast.Gt,
+    ast.GtE,
+    ast.In,
+    ast.NotIn,
+    ast.BinOp,
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.Div,
+    ast.Name,
+    ast.Load,
+    ast.Constant,
+    ast.Tuple,
+    ast.List,
+)
+
+
+class Constraint:
+    """A condition on the inputs of a point, points for which it holds are skipped
+
+    The condition is a Python expression over the names of the base and sweep elements,
+    e.g. `vary_base_electrification < 40 and vary_insulation_values == "G"`. Only
+    comparisons, and/or/not, arithmetic, names and constants are allowed, so a
+    constraint cannot call functions or access attributes.
+    """
+
+    def __init__(self, expression: str, names: Iterable[str]) -> None:
+        self.expression = expression
+        try:
+            tree = ast.parse(expression.strip(), mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"constraint (={expression}) is not an expression: {e.msg}")
+
+        names = set(names)
+        for node in ast.walk(tree):
+            if not isinstance(node, ALLOWED_NODES):
+                raise ValueError(
+                    f"constraint (={expression}) may only use comparisons, and/or/not, "
+                    f"arithmetic, input names and constants, not {type(node).__name__}"
+                )
+            if isinstance(node, ast.Name) and node.id not in names:
+                raise ValueError(
+                    f"constraint (={expression}) uses {node.id}, which is not one of "
+                    f"the inputs {sorted(names)}"
+                )
+        self.code = compile(tree, "<constraint>", "eval")
+
+    def __call__(self, values: Dict[str, Any]) -> bool:
+        """Return whether the constraint holds for the values of a point by name"""
+        try:
+            return bool(eval(self.code, {"__builtins__": {}}, values))
+        except (TypeError, ZeroDivisionError) as e:
+            raise ValueError(
+                f"constraint (={self.expression}) cannot be evaluated for {values}: {e}"
+            ) from e
+
+    def __repr__(self) -> str:
+        return f"Constraint({self.expression!r})"
+
+
+class Constraints:
+    """The constraints of an experiment, a point is skipped if any of them holds"""
+
+    def __init__(self, expressions: List[str], names: Iterable[str]) -> None:
+        names = list(names)
+        self.constraints = [Constraint(expression, names) for expression in expressions]
+
+    def __len__(self):
+        return len(self.constraints)
+
+    def skip(self, values: Dict[str, Any]) -> bool:
+        """Return whether a point with the values by name should be skipped"""
+        return any(constraint(values) for constraint in self.constraints)
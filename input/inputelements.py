@@ -1,5 +1,6 @@
-from pydantic import BaseModel, validator, PrivateAttr
-from typing import Union, Dict, List
+from pydantic import BaseModel, StrictInt, validator
+from typing import Union, Dict, List, Sequence, Tuple
+from math import prod
 
 
 class InteractiveElement(BaseModel):
@@ -17,7 +18,7 @@ class InteractiveElement(BaseModel):
 class ContinousInteractiveElement(InteractiveElement):
     """Class to represent a continous interactive element"""
 
-    value: Union[int, float]
+    value: Union[StrictInt, float]
 
 
 class DiscreteInteractiveElement(InteractiveElement):
@@ -30,63 +31,110 @@ class DiscreteInteractiveElementSweep(InteractiveElement):
     """Class to represent a discrete interactive element sweep, yields single interactive elements on iteration"""
 
     options: List[str]
-    _current: Union[int, float] = PrivateAttr()
 
-    def __init__(self, **data):
-        super().__init__(**data)
-        self._current = 0
+    def __len__(self):
+        return len(self.options)
 
-    def __iter__(self):
-        return self
+    def __getitem__(self, index: int):
+        return DiscreteInteractiveElement(id=self.id, value=self.options[index])
 
-    def __next__(self):
-        if self._current == len(self.options):
-            raise StopIteration
-        else:
-            result = self.options[self._current]
-            self._current += 1
-            return DiscreteInteractiveElement(id=self.id, value=result)
+    def __iter__(self):
+        return (self[index] for index in range(len(self)))
 
 
 class ContinousInteractiveElementSweep(InteractiveElement):
     """Class to represent a continous interactive element sweep, yields single interactive elements on iteration"""
 
-    lower_bound: Union[int, float]
-    upper_bound: Union[int, float]
-    step: Union[int, float]
-    _current: Union[int, float] = PrivateAttr()
-
-    def __init__(self, **data):
-        super().__init__(**data)
-        self._current = self.lower_bound
+    lower_bound: Union[StrictInt, float]
+    upper_bound: Union[StrictInt, float]
+    step: Union[StrictInt, float]
 
     @validator("step")
     def step_must_fit_range(cls, v, values):
         step, upper, lower = v, values["upper_bound"], values["lower_bound"]
-        if (upper - lower) % step != 0:
+        steps = (upper - lower) / step
+        if abs(steps - round(steps)) > 1e-9:
             raise ValueError(
                 f"step (={step}) of id {values['id']} must fit in range (=[{upper}, {lower}])])"
             )
         return v
 
+    def __len__(self):
+        return round((self.upper_bound - self.lower_bound) / self.step) + 1
+
+    def value(self, index: int) -> Union[int, float]:
+        """Return the value at index, computed from the index so float steps do not accumulate errors"""
+        value = self.lower_bound + index * self.step
+        if isinstance(value, float):
+            value = round(value, 10)
+        return value
+
+    def __getitem__(self, index: int):
+        if not -len(self) <= index < len(self):
+            raise IndexError(f"index {index} out of range for sweep of id {self.id}")
+        if index < 0:
+            index += len(self)
+        return ContinousInteractiveElement(id=self.id, value=self.value(index))
+
     def __iter__(self):
-        return self
+        return (self[index] for index in range(len(self)))
+
+
+Sweep = Union[ContinousInteractiveElementSweep, DiscreteInteractiveElementSweep]
+
+
+class SweepSpace:
+    """Class to represent the Cartesian product of sweeps without materializing it
 
-    def __next__(self):
-        if self._current > self.upper_bound:
-            raise StopIteration
-        else:
-            result = self._current
-            self._current += self.step
-            return ContinousInteractiveElement(id=self.id, value=result)
+    Points are numbered in the order of itertools.product, the last sweep varies fastest.
+    Any index maps to its point in O(1), so the space can be re-iterated, sliced and
+    sampled. Without sweeps, the space has a single empty point.
+    """
+
+    def __init__(self, sweeps: Sequence[Sweep]) -> None:
+        self.sweeps = list(sweeps)
+        self.shape = tuple(len(sweep) for sweep in self.sweeps)
+
+    def __len__(self):
+        return prod(self.shape)
+
+    def unravel(self, index: int) -> Tuple[int, ...]:
+        """Return the index into every sweep of the point at index"""
+        if not 0 <= index < len(self):
+            raise IndexError(f"index {index} out of range for sweep space of {len(self)} points")
+        indices = []
+        for size in reversed(self.shape):
+            index, remainder = divmod(index, size)
+            indices.append(remainder)
+        return tuple(reversed(indices))
+
+    def ravel(self, indices: Sequence[int]) -> int:
+        """Return the index of the point with the given index into every sweep"""
+        index = 0
+        for i, size in zip(indices, self.shape):
+            index = index * size + i
+        return index
+
+    def point(self, indices: Sequence[int]) -> Tuple[InteractiveElement, ...]:
+        """Return the point with the given index into every sweep"""
+        return tuple(sweep[i] for sweep, i in zip(self.sweeps, indices))
+
+    def __getitem__(self, index: Union[int, slice]):
+        """Return the point at index, counting from the end if negative, or a list of points"""
+        if isinstance(index, slice):
+            return [self[i] for i in range(len(self))[index]]
+        if -len(self) <= index < 0:
+            index += len(self)
+        return self.point(self.unravel(index))
+
+    def __iter__(self):
+        return (self[index] for index in range(len(self)))
 
 
 class InteractiveInputs(BaseModel):
     """Class to contain sets of interactive elements"""
 
-    base: Union[
-        Dict[str, Union[ContinousInteractiveElement, DiscreteInteractiveElement]], None
-    ]
+    base: Union[Dict[str, Union[ContinousInteractiveElement, DiscreteInteractiveElement]], None]
     sweep: Union[
         Dict[
             str,
@@ -94,3 +142,10 @@ class InteractiveInputs(BaseModel):
         ],
         None,
     ]
+
+    @property
+    def sweep_space(self) -> SweepSpace:
+        """Return the space of all combinations of the sweeps"""
+        if self.sweep is None:
+            return SweepSpace([])
+        return SweepSpace(self.sweep.values())
@@ -0,0 +1,97 @@
+from pydantic import BaseModel, validator
+from typing import Literal, Tuple
+import numpy as np
+
+from .inputelements import InteractiveElement, SweepSpace
+
+
+class Sampling(BaseModel):
+    """Class to represent the settings to sample points from the sweep space"""
+
+    method: Literal["random", "latin_hypercube", "sobol"]
+    samples: int
+    seed: int = 0
+
+    @validator("samples")
+    def samples_must_be_positive(cls, v):
+        if v < 1:
+            raise ValueError(f"samples (={v}) must be at least 1")
+        return v
+
+
+def unit_samples(method: str, samples: int, dimensions: int, seed: int) -> np.ndarray:
+    """Return a (samples, dimensions) array of samples in the unit hypercube [0, 1)"""
+    rng = np.random.default_rng(seed)
+
+    if method == "random":
+        return rng.random((samples, dimensions))
+
+    if method == "latin_hypercube":
+        # one sample in each of the `samples` strata of every dimension, strata shuffled
+        # independently per dimension
+        strata = rng.permuted(np.tile(np.arange(samples), (dimensions, 1)), axis=1).T
+        return (strata + rng.random((samples, dimensions))) / samples
+
+    if method == "sobol":
+        try:
+            from scipy.stats import qmc
+        except ImportError as e:
+            raise ImportError(
+                "Sobol sampling requires scipy, install it with `poetry install -E sampling`"
+            ) from e
+        return qmc.Sobol(d=dimensions, scramble=True, seed=seed).random(samples)
+
+    raise ValueError(f"Unknown sampling method {method}")
+
+
+class SampledSpace:
+    """Class to represent a fixed number of distinct points sampled from a sweep space
+
+    Samples are drawn in the unit hypercube and mapped onto the grid of every sweep, so
+    continuous sweeps are sampled at multiples of their step and discrete sweeps over
+    their options. Samples that land on a grid point drawn before are replaced by
+    samples of a next draw. With the same seed the same points are drawn, so runs can
+    be resumed.
+    """
+
+    def __init__(self, space: SweepSpace, sampling: Sampling) -> None:
+        if sampling.samples > len(space):
+            raise ValueError(
+                f"samples (={sampling.samples}) must be at most the {len(space)} points "
+                "of the sweep space"
+            )
+        self.space = space
+        self.sampling = sampling
+
+        shape = np.array(space.shape, dtype=int)
+        cells = np.empty(0, dtype=np.int64)
+        draw = 0
+        while len(cells) < sampling.samples:
+            seed = sampling.seed
+            if draw:
+                seed = int(np.random.SeedSequence([seed, draw]).generate_state(1)[0])
+            samples = unit_samples(sampling.method, sampling.samples, len(shape), seed)
+            indices = np.minimum((samples * shape).astype(int), shape - 1)
+            # keep the first sample of every grid point, in order of drawing
+            cells = np.concatenate([cells, np.ravel_multi_index(indices.T, shape)])
+            _, first = np.unique(cells, return_index=True)
+            cells = cells[np.sort(first)][: sampling.samples]
+            draw += 1
+        self.indices = np.stack(np.unravel_index(cells, shape), axis=1)
+
+    @property
+    def shape(self):
+        return self.space.shape
+
+    def __len__(self):
+        return len(self.indices)
+
+    def unravel(self, index: int) -> Tuple[int, ...]:
+        """Return the index into every sweep of the sample at index"""
+        return tuple(int(i) for i in self.indices[index])
+
+    def __getitem__(self, index: int) -> Tuple[InteractiveElement, ...]:
+        return self.space.point(self.unravel(index))
+
+    def __iter__(self):
+        return (self[index] for index in range(len(self)))
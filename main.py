@@ -1,5 +1,9 @@
-from experiment import Experiment
+"""Run single_base.yaml, takes the options of `python cli.py`, e.g. --shard 1/4"""
 
-e = Experiment.load_from_yaml("single_base.yaml")
-e.run(disable_caching=False, enable_sentry_logging=False)
+import sys
+from pathlib import Path
 
+from cli import main
+
+if __name__ == "__main__":
+    main([str(Path(__file__).parent / "single_base.yaml"), *sys.argv[1:]])
@@ -6,4 +6,8 @@ from .response import (
     DashboardResultSet,
 )
 
-from .importer import ResultLoader
+from .importer import ResultLoader, LoadedRun
+from .costbenefit import CostBenefitTable
+from .writer import CSVSink, ParquetSink, open_sink
+from .archive import ScenarioArchive
+from .catalog import ExperimentCatalog
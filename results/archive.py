@@ -0,0 +1,83 @@
+import hashlib
+import sqlite3
+import threading
+import zlib
+from pathlib import Path
+
+ARCHIVE_FILE = "scenarios.sqlite"
+
+
+class ScenarioArchive:
+    """Compressed store of the scenario and anylogic files of a run in a single file
+
+    Files are stored per (uuid, kind), where kind is "scenario" or "anylogic". The
+    contents are deduplicated by their sha256 hash and compressed with zlib, so a sweep
+    of thousands of points that share a scenario only stores it once.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+        with self._lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS blobs (hash TEXT PRIMARY KEY, data BLOB)"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS files "
+                "(uuid TEXT, kind TEXT, hash TEXT, PRIMARY KEY (uuid, kind)) WITHOUT ROWID"
+            )
+
+    def put(self, uuid: str, kind: str, content: bytes):
+        """Store the file of a uuid, only compressing contents not seen before"""
+        content_hash = hashlib.sha256(content).hexdigest()
+        with self._lock, self.connection:
+            known = self.connection.execute(
+                "SELECT 1 FROM blobs WHERE hash = ?", (content_hash,)
+            ).fetchone()
+            if known is None:
+                self.connection.execute(
+                    "INSERT INTO blobs VALUES (?, ?)",
+                    (content_hash, zlib.compress(content)),
+                )
+            self.connection.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?)",
+                (uuid, kind, content_hash),
+            )
+
+    def get(self, uuid: str, kind: str = "scenario") -> str:
+        """Return the file of a uuid, raises a KeyError if it is not in the archive"""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT data FROM files JOIN blobs USING (hash) "
+                "WHERE uuid = ? AND kind = ?",
+                (uuid, kind),
+            ).fetchone()
+        if row is None:
+            raise KeyError(f"No {kind} file for uuid {uuid} in {self.path}")
+        return zlib.decompress(row[0]).decode()
+
+    def __contains__(self, uuid: str):
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT 1 FROM files WHERE uuid = ?", (uuid,)
+            ).fetchone()
+        return row is not None
+
+    def merge(self, path: Path):
+        """Add all files of another archive, blobs already in this archive are kept"""
+        with self._lock, self.connection:
+            self.connection.execute("ATTACH DATABASE ? AS source", (str(path),))
+            self.connection.execute(
+                "INSERT OR IGNORE INTO blobs SELECT * FROM source.blobs"
+            )
+            self.connection.execute(
+                "INSERT OR REPLACE INTO files SELECT * FROM source.files"
+            )
+        self.connection.execute("DETACH DATABASE source")
+
+    def close(self):
+        self.connection.close()
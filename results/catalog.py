@@ -0,0 +1,208 @@
+"""SQL over the outputs of all experiments and versions
+
+The catalog defines DuckDB views over the csv and parquet files of every run in an
+experiment outputs folder, so queries only read the files (and columns) they need
+instead of loading runs into pandas. Every view has `experiment` and
+`experiment_version` columns, so the tables can be joined on
+(experiment, experiment_version, uuid):
+
+    inputs(experiment, experiment_version, uuid, id, value)
+    results(experiment, experiment_version, uuid, level, kpi, value)
+    cost_benefit(experiment, experiment_version, uuid, group, counterparty, actor, value)
+    errors(experiment, experiment_version, uuid, error_msg)
+    timings(experiment, experiment_version, uuid, connect, ttfb, download, total)
+    runs(experiment, experiment_version, format)
+
+Cost benefit results are in long form for all runs, overview rows have no actor. For
+example, the lowest local costs per insulation label over all runs:
+
+    SELECT i.value AS label, min(r.value) AS costs
+    FROM results r JOIN inputs i USING (experiment, experiment_version, uuid)
+    WHERE r.level = 'local' AND r.kpi = 'costs' AND i.id = 440022
+    GROUP BY label
+
+Query from the command line with `python -m results.catalog "<sql>"`.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Union
+import argparse
+
+from .writer import TABLE_COLUMNS, UUID_INDEXED
+
+# column types of the views, the columns of all runs are cast to these
+CATALOG_COLUMNS = {
+    "inputs": {"uuid": "VARCHAR", "id": "BIGINT", "value": "VARCHAR"},
+    "results": {
+        "uuid": "VARCHAR",
+        "level": "VARCHAR",
+        "kpi": "VARCHAR",
+        "value": "DOUBLE",
+    },
+    "cost_benefit": {
+        "uuid": "VARCHAR",
+        "group": "VARCHAR",
+        "counterparty": "VARCHAR",
+        "actor": "VARCHAR",
+        "value": "DOUBLE",
+    },
+    "errors": {"uuid": "VARCHAR", "error_msg": "VARCHAR"},
+    "timings": {
+        "uuid": "VARCHAR",
+        "connect": "DOUBLE",
+        "ttfb": "DOUBLE",
+        "download": "DOUBLE",
+        "total": "DOUBLE",
+    },
+}
+
+RUN_COLUMNS = {"experiment": "VARCHAR", "experiment_version": "VARCHAR"}
+
+# nested cost benefit results of csv runs, JSON (or str() of the dicts in older runs)
+OVERVIEW_TYPE = "MAP(VARCHAR, MAP(VARCHAR, DOUBLE))"
+DETAIL_TYPE = "MAP(VARCHAR, MAP(VARCHAR, MAP(VARCHAR, DOUBLE)))"
+
+
+def quote(value: str) -> str:
+    """Quote a string as an SQL literal"""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def run_columns(depth: int) -> str:
+    """Experiment and version columns taken from the path of the file read"""
+    parts = "string_split(replace(filename, '\\', '/'), '/')"
+    return (
+        f"{parts}[-{depth + 1}] AS experiment, {parts}[-{depth}] AS experiment_version"
+    )
+
+
+def cast_columns(columns: Dict[str, str]) -> str:
+    return ", ".join(
+        f'CAST("{name}" AS {type_}) AS "{name}"' for name, type_ in columns.items()
+    )
+
+
+class ExperimentCatalog:
+    """Queryable catalog of all runs in an experiment outputs folder
+
+    The views read the files matching a glob, so runs that are added later are included
+    as well. Call `refresh` when the first run of an output format was added.
+    Requires duckdb, install with `poetry install -E query`.
+    """
+
+    def __init__(self, path: Union[str, Path] = None, database: str = ":memory:"):
+        try:
+            import duckdb
+        except ImportError:
+            raise ImportError(
+                "The experiment catalog requires duckdb, install it with "
+                "`poetry install -E query`"
+            )
+        if path is None:
+            path = Path(__file__).parent.parent / "experiment_outputs"
+        self.path = Path(path).resolve()
+        self.connection = duckdb.connect(database)
+        self.refresh()
+
+    def refresh(self):
+        """(Re)create the views over the runs in the folder"""
+        for table, columns in CATALOG_COLUMNS.items():
+            selects = self.csv_selects(table) + self.parquet_selects(table)
+            if not selects:
+                # no runs with this table, an empty view with the right columns
+                nulls = ", ".join(
+                    f'NULL::{type_} AS "{name}"'
+                    for name, type_ in {**RUN_COLUMNS, **columns}.items()
+                )
+                selects = [f"SELECT {nulls} WHERE false"]
+            sql = " UNION ALL BY NAME ".join(selects)
+            self.connection.execute(f"CREATE OR REPLACE VIEW {table} AS {sql}")
+
+        runs = [
+            (
+                run.parent.name,
+                run.name,
+                "parquet" if (run / "inputs.parquet").exists() else "csv",
+            )
+            for run in sorted(self.path.glob("*/*"))
+            if (run / "inputs.parquet").exists() or (run / "inputs.csv").exists()
+        ]
+        self.connection.execute(
+            "CREATE OR REPLACE TABLE runs "
+            "(experiment VARCHAR, experiment_version VARCHAR, format VARCHAR)"
+        )
+        if runs:
+            self.connection.executemany("INSERT INTO runs VALUES (?, ?, ?)", runs)
+
+    def csv_selects(self, table: str) -> List[str]:
+        if not any(self.path.glob(f"*/*/{table}.csv")):
+            return []
+
+        # columns in the layout of DataFrame.to_csv, the first column is the index
+        if table in UUID_INDEXED:
+            names = TABLE_COLUMNS[table]
+        else:
+            names = ["row", *TABLE_COLUMNS[table]]
+        types = ", ".join(f"{quote(name)}: 'VARCHAR'" for name in names)
+        pattern = str(self.path / "*" / "*" / f"{table}.csv")
+        read = (
+            f"read_csv({quote(pattern)}, header = true, filename = true, "
+            f"quote = '\"', escape = '\"', columns = {{{types}}})"
+        )
+
+        if table != "cost_benefit":
+            return [
+                f"SELECT {run_columns(2)}, {cast_columns(CATALOG_COLUMNS[table])} "
+                f"FROM {read}"
+            ]
+
+        # flatten the nested overview and detail to the long form of parquet runs
+        nested = f"SELECT {run_columns(2)}, uuid, overview, detail FROM {read}"
+        # runs from before the values were written as JSON hold the repr of the dicts
+        decode = (
+            "from_json(CASE WHEN {0} LIKE '{{''%' THEN replace({0}, '''', '\"') "
+            "ELSE {0} END, '\"{1}\"')"
+        )
+        overview = (
+            'SELECT experiment, experiment_version, uuid, g.key AS "group", '
+            "c.key AS counterparty, NULL::VARCHAR AS actor, c.value AS value FROM "
+            "(SELECT experiment, experiment_version, uuid, "
+            f"unnest(map_entries({decode.format('overview', OVERVIEW_TYPE)})) AS g "
+            f"FROM ({nested})), unnest(map_entries(g.value)) AS t(c)"
+        )
+        detail = (
+            'SELECT experiment, experiment_version, uuid, "group", '
+            "c.key AS counterparty, a.key AS actor, a.value AS value FROM "
+            '(SELECT experiment, experiment_version, uuid, g.key AS "group", '
+            "unnest(map_entries(g.value)) AS c FROM "
+            "(SELECT experiment, experiment_version, uuid, "
+            f"unnest(map_entries({decode.format('detail', DETAIL_TYPE)})) AS g "
+            f"FROM ({nested}))), unnest(map_entries(c.value)) AS t(a)"
+        )
+        return [overview, detail]
+
+    def parquet_selects(self, table: str) -> List[str]:
+        if not any(self.path.glob(f"*/*/{table}.parquet/*.parquet")):
+            return []
+        pattern = str(self.path / "*" / "*" / f"{table}.parquet" / "*.parquet")
+        return [
+            f"SELECT {run_columns(3)}, {cast_columns(CATALOG_COLUMNS[table])} "
+            f"FROM read_parquet({quote(pattern)}, filename = true)"
+        ]
+
+    def query(self, sql: str, parameters: list = None):
+        """Run a query, returns the result as a pandas dataframe"""
+        return self.connection.execute(sql, parameters).df()
+
+    def close(self):
+        self.connection.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sql", help="query over the views of the catalog")
+    parser.add_argument("--path", help="experiment outputs folder")
+    args = parser.parse_args()
+
+    catalog = ExperimentCatalog(args.path)
+    print(catalog.query(args.sql).to_string())
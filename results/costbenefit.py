@@ -0,0 +1,124 @@
+import json
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from .response import COST_BENEFIT_LONG_COLUMNS, flatten_cost_benefit
+
+# the levels of a cost benefit value, the actor is missing for overview values
+DIMENSIONS = ["group", "counterparty", "actor"]
+
+
+def in_order(values: pd.Series) -> pd.Categorical:
+    """Categorical of values, with the categories in order of first appearance"""
+    return pd.Categorical(values, categories=pd.unique(values.dropna()))
+
+
+class CostBenefitTable:
+    """The cost benefit results of a run in long form, indexed by uuid
+
+    Built once per run from long (parquet) or nested (csv) cost benefit results, the
+    nested results are decoded a single time. Uuid, group, counterparty and actor are
+    categoricals and the rows are sorted by uuid, so the rows of a uuid are a slice
+    and aggregates over all uuids, e.g. the total "Netto kosten" per group, are
+    groupbys over integer codes instead of loops over nested dicts.
+    """
+
+    def __init__(self, long: pd.DataFrame) -> None:
+        data = pd.DataFrame(
+            {column: in_order(long[column]) for column in ["uuid", *DIMENSIONS]}
+        )
+        data["value"] = long["value"].to_numpy(dtype=float)
+        # a stable sort keeps the order of the results within a uuid
+        order = np.argsort(data["uuid"].cat.codes.to_numpy(), kind="stable")
+        self.data = data.iloc[order].reset_index(drop=True)
+
+        codes = self.data["uuid"].cat.codes.to_numpy()
+        uuids = self.data["uuid"].cat.categories
+        bounds = np.searchsorted(codes, np.arange(len(uuids) + 1))
+        self._slices = {
+            uuid: slice(start, stop)
+            for uuid, start, stop in zip(uuids, bounds[:-1], bounds[1:])
+        }
+
+    @classmethod
+    def from_nested(cls, cost_benefit: pd.DataFrame) -> "CostBenefitTable":
+        """Build the table from nested (uuid, overview, detail) rows of a csv run"""
+        rows = []
+        for uuid, overview, detail in cost_benefit[
+            ["uuid", "overview", "detail"]
+        ].itertuples(index=False):
+            rows.extend(flatten_cost_benefit(uuid, decode(overview), decode(detail)))
+        return cls(pd.DataFrame.from_records(rows, columns=COST_BENEFIT_LONG_COLUMNS))
+
+    @classmethod
+    def from_cost_benefit(cls, cost_benefit: pd.DataFrame) -> "CostBenefitTable":
+        """Build the table from the cost benefit results of a run in either form"""
+        if cost_benefit.empty:
+            return cls(pd.DataFrame(columns=COST_BENEFIT_LONG_COLUMNS))
+        if "overview" in cost_benefit.columns:
+            return cls.from_nested(cost_benefit)
+        return cls(cost_benefit)
+
+    @property
+    def uuids(self) -> pd.Index:
+        return self.data["uuid"].cat.categories
+
+    def rows(self, uuid: str) -> pd.DataFrame:
+        """The rows of a uuid, in the order of its results"""
+        return self.data.iloc[self._slices.get(uuid, slice(0, 0))]
+
+    @staticmethod
+    def pivot(rows: pd.DataFrame, index: str, columns: str) -> pd.DataFrame:
+        """Pivot rows of a single uuid, keeping the order of the original results"""
+        rows = rows.astype({index: object, columns: object})
+        return rows.pivot(index=index, columns=columns, values="value").reindex(
+            index=rows[index].unique(), columns=rows[columns].unique()
+        )
+
+    def overview(self, uuid: str) -> pd.DataFrame:
+        """The overview of a uuid as a counterparty x group table"""
+        rows = self.rows(uuid)
+        return self.pivot(rows[rows["actor"].isna()], "counterparty", "group")
+
+    def detail(self, uuid: str, group: str) -> pd.DataFrame:
+        """The detail of a group of a uuid as an actor x counterparty table"""
+        rows = self.rows(uuid)
+        rows = rows[rows["actor"].notna() & (rows["group"] == group)]
+        return self.pivot(rows, "actor", "counterparty")
+
+    def detail_options(self, uuid: str) -> List[str]:
+        """The groups with detail results of a uuid"""
+        rows = self.rows(uuid)
+        return list(rows.loc[rows["actor"].notna(), "group"].astype(object).unique())
+
+    def aggregate(
+        self, by: List[str], func: str = "sum", detail: bool = True, **filters: str
+    ) -> pd.Series:
+        """Aggregate the values over all uuids, grouped by some of uuid/group/counterparty/actor
+
+        Only detail values are used, or only overview values with detail=False. Keyword
+        filters select a single group, counterparty or actor, e.g. the total net costs
+        per group over all uuids is `aggregate(["group"], actor="Netto kosten")`.
+        """
+        codes = self.data["actor"].cat.codes.to_numpy()
+        mask = codes >= 0 if detail else codes < 0
+        for dimension, value in filters.items():
+            if dimension not in DIMENSIONS:
+                raise ValueError(f"Can only filter on {DIMENSIONS}, not {dimension}")
+            categories = self.data[dimension].cat.categories
+            code = categories.get_loc(value) if value in categories else -2
+            mask &= self.data[dimension].cat.codes.to_numpy() == code
+        return self.data[mask].groupby(by, observed=True, sort=False)["value"].agg(func)
+
+
+def decode(value) -> dict:
+    """Decode a nested cost benefit value of a csv file"""
+    if isinstance(value, dict):
+        return value
+    try:
+        return json.loads(value)
+    except ValueError:
+        # runs from before the values were written as JSON hold the repr of the dict
+        return json.loads(value.replace("'", '"'))
@@ -0,0 +1,57 @@
+import pandas as pd
+
+from execution.progress import PHASES
+
+
+def run_health(events: pd.DataFrame) -> dict:
+    """Summarise the events of a run: points, duration, throughput, latency, errors"""
+    if events.empty:
+        return {}
+    duration = events.time.max() - events.time.min()
+    posted = events.post.dropna()
+    return {
+        "points": len(events),
+        "duration_s": duration,
+        "points_per_min": 60 * (len(events) - 1) / duration if duration > 0 else None,
+        "p50_latency_s": posted.quantile(0.5) if len(posted) else None,
+        "p95_latency_s": posted.quantile(0.95) if len(posted) else None,
+        "error_rate": (events.status != "ok").mean(),
+        "cached": int(events.cached.sum()),
+    }
+
+
+def throughput(events: pd.DataFrame, freq: str = "1min") -> pd.DataFrame:
+    """Points and errors per `freq` interval of the run"""
+    events = events.set_index(pd.to_datetime(events.time, unit="s"))
+    return pd.DataFrame(
+        {
+            "points": events.point.resample(freq).count(),
+            "errors": (events.status != "ok").resample(freq).sum(),
+        }
+    )
+
+
+def phase_percentiles(
+    events: pd.DataFrame, percentiles=(0.5, 0.95, 0.99)
+) -> pd.DataFrame:
+    """Percentiles of the time spent per phase of a point, in seconds"""
+    phases = [column for column in PHASES if column in events.columns]
+    return events[phases].quantile(list(percentiles)).T
+
+
+def phase_summary(events: pd.DataFrame) -> dict:
+    """Count, mean, percentiles, maximum and total time per phase of a point, in seconds"""
+    summary = {}
+    for phase in PHASES:
+        values = events[phase].dropna() if phase in events.columns else []
+        if len(values):
+            summary[phase] = {
+                "count": int(len(values)),
+                "mean": float(values.mean()),
+                "p50": float(values.quantile(0.5)),
+                "p95": float(values.quantile(0.95)),
+                "p99": float(values.quantile(0.99)),
+                "max": float(values.max()),
+                "total": float(values.sum()),
+            }
+    return summary
@@ -1,25 +1,142 @@
 import pandas as pd
 from pathlib import Path
+from typing import Callable, Dict, Iterator, List
+from collections import OrderedDict
 import json
+import threading
+
+from .archive import ScenarioArchive, ARCHIVE_FILE
+from .costbenefit import CostBenefitTable
+from .writer import EVENTS_FILE, ROW_GROUP_SIZE
+
+# columns needed by the analysis app, parquet tables are read with this projection
+LOAD_COLUMNS = {
+    "inputs": ["uuid", "id", "value"],
+    "results": ["uuid", "level", "kpi", "value"],
+    "cost_benefit": ["uuid", "group", "counterparty", "actor", "value"],
+    "errors": ["uuid", "error_msg"],
+}
+
+
+def pivot_kpis(results: pd.DataFrame, level: str) -> pd.DataFrame:
+    """Pivot the results of a level to a uuid x kpi table"""
+    return results.query("level == @level").pivot(
+        index="uuid", columns="kpi", values="value"
+    )
+
+
+class LoadedRun:
+    """The tables of a loaded run, with the rows of each uuid indexed for lookups
+
+    Tables that are not given are read with `load(table)` when first used, so e.g. the
+    cost benefit results are only read once a point is inspected. The uuid indexes are
+    built on the first lookup in a table, after which selecting the rows of a uuid is a
+    dictionary lookup instead of a scan of the table.
+    """
+
+    TABLES = ("inputs", "results", "cost_benefit", "errors")
+
+    def __init__(
+        self,
+        inputs: pd.DataFrame = None,
+        results: pd.DataFrame = None,
+        cost_benefit: pd.DataFrame = None,
+        errors: pd.DataFrame = None,
+        load: Callable[[str], pd.DataFrame] = None,
+    ) -> None:
+        tables = zip(self.TABLES, (inputs, results, cost_benefit, errors))
+        self._tables = {table: df for table, df in tables if df is not None}
+        self._load = load
+        self._index: Dict[str, Dict[str, List[int]]] = {}
+        self._cost_benefit_table: CostBenefitTable = None
+        self._kpis: Dict[str, pd.DataFrame] = {}
+
+    def table(self, table: str) -> pd.DataFrame:
+        if table not in self._tables:
+            self._tables[table] = self._load(table)
+        return self._tables[table]
+
+    @property
+    def inputs(self) -> pd.DataFrame:
+        return self.table("inputs")
+
+    @property
+    def results(self) -> pd.DataFrame:
+        return self.table("results")
+
+    @property
+    def cost_benefit(self) -> pd.DataFrame:
+        return self.table("cost_benefit")
+
+    @property
+    def errors(self) -> pd.DataFrame:
+        return self.table("errors")
+
+    def as_tuple(self):
+        return self.inputs, self.results, self.cost_benefit, self.errors
+
+    def rows(self, table: str, uuid: str) -> pd.DataFrame:
+        """The rows of inputs, results or cost_benefit belonging to a uuid"""
+        df = self.table(table)
+        if table not in self._index:
+            self._index[table] = (
+                {} if df.empty else df.groupby("uuid", sort=False).indices
+            )
+        return df.iloc[self._index[table].get(uuid, [])]
+
+    def kpis(self, level: str) -> pd.DataFrame:
+        """The results of a level as a uuid x kpi table, pivoted once per level"""
+        if level not in self._kpis:
+            self._kpis[level] = pivot_kpis(self.results, level)
+        return self._kpis[level]
+
+    def cost_benefit_table(self) -> CostBenefitTable:
+        """The cost benefit results indexed by uuid, built on first use"""
+        if self._cost_benefit_table is None:
+            self._cost_benefit_table = CostBenefitTable.from_cost_benefit(
+                self.cost_benefit
+            )
+        return self._cost_benefit_table
+
+    def cost_benefit_overview(self, uuid: str):
+        return self.cost_benefit_table().overview(uuid)
+
+    def cost_benefit_detail(self, uuid: str, selected_detail: str):
+        return self.cost_benefit_table().detail(uuid, selected_detail)
+
+    def cost_benefit_detail_options(self, uuid: str):
+        return self.cost_benefit_table().detail_options(uuid)
 
 
 class ResultLoader:
-    def __init__(self, path: Path = None):
+    """Loads the outputs of experiments
+
+    Loaded runs are kept in memory, up to `max_runs` least recently used ones. A run is
+    loaded again when a file in its folder changed since, e.g. while it is running.
+    """
+
+    def __init__(self, path: Path = None, max_runs: int = 4):
         if path is None:
             self.path = Path(__file__).parent.parent / "experiment_outputs"
             self.path = self.path.resolve()
         else:
-            self.path = path
+            self.path = Path(path)
+        self.max_runs = max_runs
+        self._runs = OrderedDict()
+        self._lock = threading.Lock()
 
     def list_experiments(self):
         return [entry.name for entry in self.path.glob("*") if entry.is_dir()]
 
     @staticmethod
     def nice_experiment_version(name: str):
-        day = pd.to_datetime(name.split("_")[0]).strftime("%Y-%m-%d")
-        time = pd.to_datetime(name, format="%Y%m%d_%H%M%S").strftime("%H:%M:%S")
+        # runs that started in the same second have a suffix, e.g. 20240101_120000_2
+        timestamp, suffix = name[:15], name[15:].lstrip("_-")
+        day = pd.to_datetime(timestamp[:8]).strftime("%Y-%m-%d")
+        time = pd.to_datetime(timestamp, format="%Y%m%d_%H%M%S").strftime("%H:%M:%S")
 
-        return " - ".join([day, time])
+        nice = " - ".join([day, time])
+        return f"{nice} ({suffix})" if suffix else nice
 
     def list_experiment_verions(self, experiment: str):
         return [
@@ -33,48 +150,163 @@ class ResultLoader:
             if entry.is_dir()
         ]
 
-    def load_experiment_version_run(self, experiment: str, experiment_version: str):
+    def load_experiment_version_run(
+        self,
+        experiment: str,
+        experiment_version: str,
+        columns: Dict[str, List[str]] = LOAD_COLUMNS,
+    ):
+        """Load the inputs, results, cost benefit and errors of a run
+
+        Runs written as parquet are read with the column projection in `columns`, their
+        cost benefit results are in long form.
+        """
+        return self.load_run(experiment, experiment_version, columns).as_tuple()
+
+    def load_run(
+        self,
+        experiment: str,
+        experiment_version: str,
+        columns: Dict[str, List[str]] = LOAD_COLUMNS,
+    ) -> LoadedRun:
+        """Load a run, memoized until a file of the run changes
+
+        The tables of the run are read when they are first used.
+        """
         experiment_version_path = self.path / experiment / experiment_version
+        key = (experiment, experiment_version, json.dumps(columns, sort_keys=True))
+        signature = self.signature(experiment_version_path)
+
+        with self._lock:
+            if key in self._runs and self._runs[key][0] == signature:
+                self._runs.move_to_end(key)
+                return self._runs[key][1]
 
-        inputs = self.load_pd_or_empty(experiment_version_path / "inputs.csv")
-        results = self.load_pd_or_empty(experiment_version_path / "results.csv")
-        cost_benefit = self.load_pd_or_empty(
-            experiment_version_path / "cost_benefit.csv"
+        run = LoadedRun(
+            load=lambda table: self.load_table(
+                experiment_version_path, table, columns.get(table)
+            )
         )
-        errors = self.load_pd_or_empty(experiment_version_path / "errors.csv")
 
-        return inputs, results, cost_benefit, errors
+        with self._lock:
+            self._runs[key] = (signature, run)
+            self._runs.move_to_end(key)
+            while len(self._runs) > self.max_runs:
+                self._runs.popitem(last=False)
+        return run
+
+    @staticmethod
+    def signature(experiment_version_path: Path):
+        """Names, sizes and modification times of the files of a run"""
+        return tuple(
+            sorted(
+                (entry.name, stat.st_size, stat.st_mtime_ns)
+                for entry in experiment_version_path.iterdir()
+                for stat in [entry.stat()]
+            )
+        )
+
+    @staticmethod
+    def load_table(experiment_version_path: Path, table: str, columns=None):
+        """Load a table of a run from parquet if available, csv otherwise"""
+        parquet_path = experiment_version_path / f"{table}.parquet"
+        if not parquet_path.exists():
+            return ResultLoader.load_pd_or_empty(
+                experiment_version_path / f"{table}.csv"
+            )
+
+        df = pd.read_parquet(parquet_path, columns=columns)
+        if table in ["errors", "timings"]:
+            # consistent with the csv files, which are indexed by uuid
+            df = df.set_index("uuid")
+        return df
+
+    def iter_table(
+        self,
+        experiment: str,
+        experiment_version: str,
+        table: str,
+        columns: List[str] = None,
+        batch_size: int = ROW_GROUP_SIZE,
+    ) -> Iterator[pd.DataFrame]:
+        """Read a table of a run in chunks of at most batch_size rows
+
+        For tables too large to load at once, only a single chunk is held in memory.
+        """
+        experiment_version_path = self.path / experiment / experiment_version
+        parquet_path = experiment_version_path / f"{table}.parquet"
+        if parquet_path.exists():
+            import pyarrow.parquet as pq
+
+            for part in sorted(parquet_path.glob("*.parquet")):
+                for batch in pq.ParquetFile(part).iter_batches(
+                    batch_size, columns=columns
+                ):
+                    df = batch.to_pandas()
+                    if table in ["errors", "timings"] and "uuid" in df:
+                        df = df.set_index("uuid")
+                    yield df
+            return
+
+        csv_path = experiment_version_path / f"{table}.csv"
+        if not csv_path.exists():
+            return
+        with pd.read_csv(
+            csv_path, index_col=0, header=0, chunksize=batch_size
+        ) as chunks:
+            for chunk in chunks:
+                if columns is not None:
+                    chunk = chunk[chunk.columns.intersection(columns)]
+                yield chunk
+
+    def load_run_events(self, experiment: str, experiment_version: str):
+        """Load the per point events of a run, empty for runs without an events log"""
+        path = self.path / experiment / experiment_version / EVENTS_FILE
+        if not path.exists():
+            return pd.DataFrame()
+        return pd.read_json(path, lines=True, convert_dates=False)
 
     def get_scenario_file(self, experiment: str, experiment_version: str, uuid: str):
+        return next(self.get_scenario_files(experiment, experiment_version, [uuid]))[1]
+
+    def get_scenario_files(
+        self, experiment: str, experiment_version: str, uuids: List[str]
+    ):
+        """Yield (uuid, scenario) for a number of uuids, opening the archive once"""
         experiment_version_path = self.path / experiment / experiment_version
 
-        with open(experiment_version_path / "scenario" / f"{uuid}.json", "r") as f:
-            scenario = f.read()
+        if (experiment_version_path / ARCHIVE_FILE).exists():
+            archive = ScenarioArchive(experiment_version_path / ARCHIVE_FILE)
+            try:
+                for uuid in uuids:
+                    yield uuid, archive.get(uuid, "scenario")
+            finally:
+                archive.close()
+            return
 
-        return scenario
+        # runs from before the archive have a file per uuid
+        for uuid in uuids:
+            with open(experiment_version_path / "scenario" / f"{uuid}.json") as f:
+                yield uuid, f.read()
 
     @staticmethod
     def cost_benefit_overview(cost_benefit: pd.DataFrame, uuid: str):
-        cost_benefit_overview = cost_benefit.set_index("uuid").at[uuid, "overview"]
-        cost_benefit_overview = json.loads(cost_benefit_overview.replace("'", '"'))
-        cost_benefit_overview = pd.DataFrame(cost_benefit_overview)
-        return cost_benefit_overview
+        """The overview of a uuid, prefer `LoadedRun.cost_benefit_overview` for lookups"""
+        return CostBenefitTable.from_cost_benefit(cost_benefit).overview(uuid)
 
     @staticmethod
     def cost_benefit_detail(
         cost_benefit: pd.DataFrame, uuid: str, selected_detail: str
     ):
-        cost_benefit_detail = cost_benefit.set_index("uuid").at[uuid, "detail"]
-        cost_benefit_detail = json.loads(cost_benefit_detail.replace("'", '"'))
-        cost_benefit_detail = cost_benefit_detail[selected_detail]
-        cost_benefit_detail = pd.DataFrame(cost_benefit_detail)
-        return cost_benefit_detail
+        """The detail of a group of a uuid, see `cost_benefit_overview`"""
+        return CostBenefitTable.from_cost_benefit(cost_benefit).detail(
+            uuid, selected_detail
+        )
 
     @staticmethod
     def cost_benefit_detail_options(cost_benefit: pd.DataFrame, uuid: str):
-        cost_benefit_detail = cost_benefit.set_index("uuid").at[uuid, "detail"]
-        cost_benefit_detail = json.loads(cost_benefit_detail.replace("'", '"'))
-        return cost_benefit_detail.keys()
+        """The groups with detail results of a uuid, see `cost_benefit_overview`"""
+        return CostBenefitTable.from_cost_benefit(cost_benefit).detail_options(uuid)
 
     @staticmethod
     def load_pd_or_empty(path: Path):
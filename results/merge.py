@@ -0,0 +1,109 @@
+"""Merge the outputs of the shards of an experiment into a single experiment version
+
+python -m results.merge experiment_outputs/<title>/<timestamp> [...]
+"""
+
+import argparse
+import json
+import shutil
+from pathlib import Path
+from typing import List, Union
+
+from .archive import ScenarioArchive, ARCHIVE_FILE
+from .writer import TABLE_COLUMNS, CONFIG_FILE, MANIFEST_FILE, SHARD_FILE, EVENTS_FILE
+from .writer import SKIPPED_FILE, create_run_folder
+
+
+def merge_csv(sources: List[Path], destination: Path):
+    """Concatenate csv files with the same header without parsing them"""
+    header = None
+    with open(destination, "w") as out:
+        for source in sources:
+            with open(source, "r") as f:
+                source_header = f.readline()
+                if header is None:
+                    header = source_header
+                    out.write(header)
+                elif source_header != header:
+                    raise ValueError(
+                        f"Columns of {source} differ from the other shards"
+                    )
+                shutil.copyfileobj(f, out)
+
+
+def merge_parquet(sources: List[Path], destination: Path):
+    """Combine the part files of parquet datasets into a single dataset"""
+    destination.mkdir()
+    parts = [
+        part for source in sources for part in sorted(source.glob("part-*.parquet"))
+    ]
+    for i, part in enumerate(parts):
+        shutil.copyfile(part, destination / f"part-{i:05d}.parquet")
+
+
+def merge_runs(folders: List[Union[str, Path]], output_folder: Union[str, Path] = None):
+    """Merge the output folders of the shards of an experiment into a new folder
+
+    All folders should hold the same experiment definition. The merged run is written to
+    a new timestamped folder next to the first shard, unless output_folder is given.
+    """
+    folders = [Path(folder) for folder in folders]
+
+    config = (folders[0] / CONFIG_FILE).read_text()
+    for folder in folders[1:]:
+        if (folder / CONFIG_FILE).read_text() != config:
+            raise ValueError(
+                f"{folder} is a run of another experiment than {folders[0]}"
+            )
+
+    shards = set()
+    for folder in folders:
+        if (folder / SHARD_FILE).exists():
+            shards.add(json.loads((folder / SHARD_FILE).read_text())["shard"])
+    counts = {int(shard.split("/")[1]) for shard in shards}
+    if len(counts) == 1 and len(shards) < counts.pop():
+        print(f"Warning, merging an incomplete set of shards: {sorted(shards)}")
+
+    if output_folder is None:
+        output_folder = create_run_folder(folders[0].parent)
+    else:
+        output_folder = Path(output_folder)
+        output_folder.mkdir(parents=True)
+    (output_folder / CONFIG_FILE).write_text(config)
+
+    for table in TABLE_COLUMNS:
+        csv_sources = [
+            f / f"{table}.csv" for f in folders if (f / f"{table}.csv").exists()
+        ]
+        parquet_sources = [
+            f / f"{table}.parquet" for f in folders if (f / f"{table}.parquet").exists()
+        ]
+        if csv_sources and parquet_sources:
+            raise ValueError(f"Cannot merge {table} of csv and parquet runs")
+        if csv_sources:
+            merge_csv(csv_sources, output_folder / f"{table}.csv")
+        if parquet_sources:
+            merge_parquet(parquet_sources, output_folder / f"{table}.parquet")
+
+    for file in [MANIFEST_FILE, EVENTS_FILE, SKIPPED_FILE]:
+        with open(output_folder / file, "w") as out:
+            for folder in folders:
+                if (folder / file).exists():
+                    out.write((folder / file).read_text())
+
+    archive = ScenarioArchive(output_folder / ARCHIVE_FILE)
+    for folder in folders:
+        if (folder / ARCHIVE_FILE).exists():
+            archive.merge(folder / ARCHIVE_FILE)
+    archive.close()
+
+    return output_folder
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("folders", nargs="+", help="output folders of the shards")
+    parser.add_argument("--output", default=None, help="folder of the merged run")
+    args = parser.parse_args()
+
+    print(f"Merged into {merge_runs(args.folders, args.output)}")
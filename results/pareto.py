@@ -0,0 +1,166 @@
+"""Pareto ranks of the points of an experiment over several KPIs
+
+The rank of a point is 1 for the points on the Pareto front, 2 for the front of the
+points that remain without it, and so on (non-dominated sorting). Points are sorted
+lexicographically first, so no point can be dominated by a point after it, and each
+point is put in the first front that does not dominate it, found with a binary search
+over the fronts:
+
+- two objectives: a front dominates a point if its lowest second objective is at most
+  that of the point, O(n log n) in total
+- three objectives: each front keeps the staircase of its points over the second and
+  third objective, a front dominates a point if the step left of it is not above it
+
+More objectives fall back to peeling off one front at a time, O(n^2) per front.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Tuple
+import io
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+# direction of the objectives that are not given, by kpi name
+DEFAULT_SENSE = {
+    "costs": "min",
+    "netload": "min",
+    "self_sufficiency": "max",
+    "sustainability": "max",
+}
+
+
+def pareto_ranks(values: np.ndarray) -> np.ndarray:
+    """Pareto rank (1 is the front) of each row of an (n, k) array, all minimized"""
+    values = np.asarray(values, dtype=float)
+    if values.ndim != 2:
+        raise ValueError("values should be an (n_points, n_objectives) array")
+
+    # identical points do not dominate each other, rank every distinct point once
+    unique, inverse = np.unique(values, axis=0, return_inverse=True)
+    n_objectives = unique.shape[1]
+    if n_objectives == 1:
+        ranks = np.arange(1, len(unique) + 1)
+    elif n_objectives == 2:
+        ranks = ranks_2d(unique)
+    elif n_objectives == 3:
+        ranks = ranks_3d(unique)
+    else:
+        ranks = ranks_peeling(unique)
+    return ranks[inverse.ravel()]
+
+
+def ranks_2d(unique: np.ndarray) -> np.ndarray:
+    """Ranks of distinct points sorted lexicographically (as by np.unique)"""
+    ranks = np.empty(len(unique), dtype=int)
+    tails: List[float] = []  # lowest second objective per front, ascending
+    for i, second in enumerate(unique[:, 1]):
+        front = bisect_right(tails, second)
+        if front == len(tails):
+            tails.append(second)
+        else:
+            tails[front] = second
+        ranks[i] = front + 1
+    return ranks
+
+
+class Staircase:
+    """Points that are non-dominated over two objectives, sorted by the first"""
+
+    def __init__(self) -> None:
+        self.first: List[float] = []
+        self.second: List[float] = []  # descending
+
+    def dominates(self, first: float, second: float) -> bool:
+        """Whether a point of the staircase is at most (first, second) in both"""
+        step = bisect_right(self.first, first) - 1
+        return step >= 0 and self.second[step] <= second
+
+    def add(self, first: float, second: float):
+        """Add a point that is not dominated, removing the points it dominates"""
+        start = bisect_left(self.first, first)
+        end = start
+        while end < len(self.first) and self.second[end] >= second:
+            end += 1
+        self.first[start:end] = [first]
+        self.second[start:end] = [second]
+
+
+def ranks_3d(unique: np.ndarray) -> np.ndarray:
+    """Ranks of distinct points sorted lexicographically (as by np.unique)"""
+    ranks = np.empty(len(unique), dtype=int)
+    fronts: List[Staircase] = []
+    for i, (_, second, third) in enumerate(unique):
+        # a front that dominates the point implies all fronts before it do as well
+        low, high = 0, len(fronts)
+        while low < high:
+            middle = (low + high) // 2
+            if fronts[middle].dominates(second, third):
+                low = middle + 1
+            else:
+                high = middle
+        if low == len(fronts):
+            fronts.append(Staircase())
+        fronts[low].add(second, third)
+        ranks[i] = low + 1
+    return ranks
+
+
+def ranks_peeling(unique: np.ndarray) -> np.ndarray:
+    """Ranks of distinct points by repeatedly removing the non-dominated points"""
+    ranks = np.zeros(len(unique), dtype=int)
+    remaining = np.arange(len(unique))
+    rank = 1
+    while len(remaining):
+        points = unique[remaining]
+        dominated = np.zeros(len(points), dtype=bool)
+        for point in points:
+            dominated |= (point <= points).all(axis=1) & (point < points).any(axis=1)
+        ranks[remaining[~dominated]] = rank
+        remaining = remaining[dominated]
+        rank += 1
+    return ranks
+
+
+def rank_results(results: pd.DataFrame, objectives: Dict[str, str]) -> pd.DataFrame:
+    """Pareto rank of every uuid over objectives {"level.kpi": "min" | "max"}
+
+    Returns a table indexed by uuid with a column per objective and the rank, sorted by
+    rank. Points without a value for one of the objectives (errors) are left out.
+    """
+    for objective, sense in objectives.items():
+        if sense not in ("min", "max"):
+            raise ValueError(f"sense of {objective} (={sense}) should be min or max")
+
+    wide = results.pivot(index="uuid", columns=["level", "kpi"], values="value")
+    wide.columns = [f"{level}.{kpi}" for level, kpi in wide.columns]
+    table = wide[list(objectives)].dropna()
+
+    signs = np.array([1 if sense == "min" else -1 for sense in objectives.values()])
+    table["rank"] = pareto_ranks(table.to_numpy() * signs)
+    return table.sort_values("rank", kind="stable")
+
+
+def default_objectives(level: str, kpis: List[str]) -> Dict[str, str]:
+    """Objectives of kpis on a level, minimizing or maximizing as in DEFAULT_SENSE"""
+    return {f"{level}.{kpi}": DEFAULT_SENSE.get(kpi, "min") for kpi in kpis}
+
+
+def front_with_inputs(ranked: pd.DataFrame, inputs: pd.DataFrame, rank: int = 1):
+    """The points up to a rank with their objectives and inputs, one column per input"""
+    front = ranked[ranked["rank"] <= rank]
+    values = inputs[inputs.uuid.isin(front.index)].pivot(
+        index="uuid", columns="id", values="value"
+    )
+    return front.join(values)
+
+
+def export_front(front: pd.DataFrame, scenarios: Iterable[Tuple[str, str]]) -> bytes:
+    """Zip a front (see front_with_inputs) as front.csv with scenarios/<uuid>.json"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("front.csv", front.to_csv())
+        for uuid, scenario in scenarios:
+            archive.writestr(f"scenarios/{uuid}.json", scenario)
+    return buffer.getvalue()
@@ -1,15 +1,48 @@
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
+import numpy as np
 
+from .importer import pivot_kpis
 
-def plot_kpi(results: pd.DataFrame, level: str, sort_by: str = "costs"):
-    sdf = (
-        results.query("level == @level")
-        .set_index("uuid")
-        .pivot(columns="kpi", values="value")
-        .sort_values(by=sort_by)
-    )
+# above this number of points per trace, traces are downsampled and drawn with WebGL
+MAX_POINTS = 2000
+
+
+def minmax_indices(y: np.ndarray, max_points: int) -> np.ndarray:
+    """Positions of the minimum and maximum of y in each of max_points / 2 bins
+
+    Keeps the shape of a line, including its extremes, with at most max_points points.
+    """
+    n_bins = max(max_points // 2, 1)
+    size = -(-len(y) // n_bins)  # ceil
+    padded = np.full(n_bins * size, np.nan)
+    padded[: len(y)] = y
+    bins = padded.reshape(n_bins, size)
+
+    filled = ~np.isnan(bins).all(axis=1)
+    offsets = np.arange(n_bins)[filled] * size
+    low = offsets + np.nanargmin(bins[filled], axis=1)
+    high = offsets + np.nanargmax(bins[filled], axis=1)
+    return np.unique(np.concatenate([low, high]))
+
+
+def plot_kpi(
+    results: pd.DataFrame,
+    level: str,
+    sort_by: str = "costs",
+    pivot: pd.DataFrame = None,
+    max_points: int = MAX_POINTS,
+):
+    """Plot the KPIs of a level for all uuids, sorted by one of the KPIs
+
+    Pass a pivot (see `pivot_kpis`) to skip pivoting the results. Traces with more than
+    max_points points are downsampled with min/max binning and drawn with WebGL. The x
+    values are the uuids of the points that are drawn, so clicks map to a uuid.
+    """
+    if pivot is None:
+        pivot = pivot_kpis(results, level)
+    sdf = pivot.sort_values(by=sort_by)
 
     fig = make_subplots(
         rows=2,
@@ -36,8 +69,12 @@ def plot_kpi(results: pd.DataFrame, level: str, sort_by: str = "costs"):
 
     for kpi in sdf.columns:
         gdf = sdf[[kpi]].dropna()
+        scatter = go.Scatter
+        if len(gdf) > max_points:
+            gdf = gdf.iloc[minmax_indices(gdf[kpi].to_numpy(), max_points)]
+            scatter = go.Scattergl
         fig.add_trace(
-            go.Scatter(
+            scatter(
                 x=gdf.index,
                 y=gdf[kpi],
                 mode="lines",
@@ -1,9 +1,54 @@
 from pydantic import BaseModel
-from typing import Union, Dict
+from typing import Union, Dict, List, Tuple
 import pandas as pd
-from pathlib import Path
 import json
 
+try:
+    import orjson
+except ImportError:  # optional, install with `poetry install -E fast-json`
+    orjson = None
+
+DASHBOARD_COLUMNS = ["uuid", "level", "kpi", "value"]
+COST_BENEFIT_COLUMNS = ["uuid", "overview", "detail"]
+COST_BENEFIT_LONG_COLUMNS = ["uuid", "group", "counterparty", "actor", "value"]
+
+
+def json_loads(data: Union[bytes, str]):
+    """Decode JSON, using orjson if it is installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj) -> bytes:
+    """Encode JSON to bytes, using orjson if it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+
+def flatten_cost_benefit(
+    uuid: str,
+    overview: Dict[str, Dict[str, float]],
+    detail: Dict[str, Dict[str, Dict[str, float]]],
+) -> List[Tuple]:
+    """Flatten cost benefit results to (uuid, group, counterparty, actor, value) rows
+
+    Overview rows have no actor (None), detail rows do.
+    """
+    rows = [
+        (uuid, group, counterparty, None, value)
+        for group, counterparties in overview.items()
+        for counterparty, value in counterparties.items()
+    ]
+    rows.extend(
+        (uuid, group, counterparty, actor, value)
+        for group, counterparties in detail.items()
+        for counterparty, actors in counterparties.items()
+        for actor, value in actors.items()
+    )
+    return rows
+
 
 class HOLONErrorReponse(BaseModel):
     """Datamodel class to represent an error response from HOLON"""
@@ -12,18 +57,19 @@ class HOLONErrorReponse(BaseModel):
     scenario: dict
     anylogic_outcomes: Union[dict, None]
 
-    def write_scenario(self, path: Path, uuid: str):
-        """Write the scenario to a json file"""
-        path = path / f"{uuid}.json"
-        with open(path, "w") as f:
-            json.dump(self.scenario, f)
+    @classmethod
+    def from_json(cls, body: Union[bytes, str]) -> "HOLONErrorReponse":
+        """Parse the body of an error response"""
+        return cls.parse_obj(json_loads(body))
+
+    def archive_scenario(self, archive, uuid: str):
+        """Add the scenario to a ScenarioArchive"""
+        archive.put(uuid, "scenario", json_dumps(self.scenario))
 
-    def write_anylogic(self, path: Path, uuid: str):
-        """Write the anylogic outcomes to a json file"""
-        path = path / f"{uuid}.json"
+    def archive_anylogic(self, archive, uuid: str):
+        """Add the anylogic outcomes to a ScenarioArchive"""
         if self.anylogic_outcomes is not None:
-            with open(path, "w") as f:
-                json.dump(self.anylogic_outcomes, f)
+            archive.put(uuid, "anylogic", json_dumps(self.anylogic_outcomes))
 
 
 class DashboardResultSet(BaseModel):
@@ -42,13 +88,18 @@ class DashboardResults(BaseModel):
     intermediate: DashboardResultSet
     national: DashboardResultSet
 
-    def to_pandas(self, uuid: str):
-        df = pd.DataFrame(columns=["uuid", "level", "kpi", "value"])
-        for level, kpi_set in self:
-            for name, value in kpi_set:
-                df.loc[len(df)] = [uuid, level, name, value]
+    def to_records(self, uuid: str) -> List[Tuple]:
+        """Convert the results to (uuid, level, kpi, value) rows"""
+        return [
+            (uuid, level, name, value)
+            for level, kpi_set in self
+            for name, value in kpi_set
+        ]
 
-        return df
+    def to_pandas(self, uuid: str):
+        return pd.DataFrame.from_records(
+            self.to_records(uuid), columns=DASHBOARD_COLUMNS
+        )
 
 
 class CostBenefitResults(BaseModel):
@@ -57,11 +108,14 @@ class CostBenefitResults(BaseModel):
     overview: Dict[str, Dict[str, float]]
     detail: Dict[str, Dict[str, Dict[str, float]]]
 
+    def to_records(self, uuid: str) -> List[Tuple]:
+        """Convert the results to a single (uuid, overview, detail) row"""
+        return [(uuid, self.overview, self.detail)]
+
     def to_pandas(self, uuid: str):
         """Convert the results to a pandas dataframe"""
-        return pd.DataFrame(
-            columns=["uuid", "overview", "detail"],
-            data=[[uuid, self.overview, self.detail]],
+        return pd.DataFrame.from_records(
+            self.to_records(uuid), columns=COST_BENEFIT_COLUMNS
         )
 
 
@@ -72,8 +126,27 @@ class HOLONResponse(BaseModel):
     dashboard_results: DashboardResults
     cost_benefit_results: CostBenefitResults
 
-    def write_scenario(self, path: Path, uuid: str):
-        """Write the scenario to a json file"""
-        path = path / f"{uuid}.json"
-        with open(path, "w") as f:
-            json.dump(self.scenario, f)
+    @classmethod
+    def from_dict(cls, data: dict) -> "HOLONResponse":
+        """Build a response, validating only the results and not the large scenario
+
+        The scenario is stored as decoded, it is not used other than to archive it.
+        """
+        if not isinstance(data, dict) or not isinstance(data.get("scenario"), dict):
+            raise TypeError("scenario of a response should be a dict")
+        return cls.construct(
+            scenario=data["scenario"],
+            dashboard_results=DashboardResults.parse_obj(data.get("dashboard_results")),
+            cost_benefit_results=CostBenefitResults.parse_obj(
+                data.get("cost_benefit_results")
+            ),
+        )
+
+    @classmethod
+    def from_json(cls, body: Union[bytes, str]) -> "HOLONResponse":
+        """Parse the body of a response, see `from_dict`"""
+        return cls.from_dict(json_loads(body))
+
+    def archive_scenario(self, archive, uuid: str):
+        """Add the scenario to a ScenarioArchive"""
+        archive.put(uuid, "scenario", json_dumps(self.scenario))
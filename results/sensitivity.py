@@ -0,0 +1,138 @@
+"""Sensitivity of the KPIs of an experiment to its interactive inputs
+
+All indices are computed from conditional means (groupby) over the points of a run, so
+they work for grid sweeps as well as for sampled designs. Inputs with more than
+`max_levels` distinct numeric values, e.g. of a sampled design, are binned into
+quantiles first.
+
+The variance based indices are the Sobol-style fractions of the variance of a KPI:
+
+- first order (S1) of an input: Var(E[kpi | input]) / Var(kpi)
+- second order (S2) of a pair: Var(E[kpi | a, b]) / Var(kpi) - S1(a) - S1(b)
+- total order (ST) of an input: 1 - Var(E[kpi | all other inputs]) / Var(kpi)
+
+The total order index needs several points per combination of the other inputs, as
+in a full grid, otherwise it is NaN.
+"""
+
+from itertools import combinations
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from .importer import pivot_kpis
+
+
+def design_matrix(
+    inputs: pd.DataFrame, results: pd.DataFrame, level: str, max_levels: int = 10
+) -> pd.DataFrame:
+    """Join the varying inputs and the KPIs of a level into a uuid x (inputs, kpis) table
+
+    Input columns are named by interactive element id, numeric values are converted
+    to numbers and binned to quantiles if they have more than max_levels values.
+    """
+    values = inputs.pivot(index="uuid", columns="id", values="value")
+    values = values.loc[:, values.nunique() > 1]
+    for column in values.columns:
+        numeric = pd.to_numeric(values[column], errors="coerce")
+        if numeric.notna().all():
+            values[column] = numeric
+            if numeric.nunique() > max_levels:
+                values[column] = pd.qcut(numeric, max_levels, duplicates="drop")
+    return values.join(pivot_kpis(results, level), how="inner")
+
+
+def input_columns(design: pd.DataFrame, kpis: List[str]) -> List:
+    return [column for column in design.columns if column not in kpis]
+
+
+def kpi_variance(design: pd.DataFrame, kpis: List[str]) -> pd.Series:
+    """Var(kpi) for every kpi, NaN for constant kpis which have no indices"""
+    values = design[kpis]
+    return values.var(ddof=0).where(values.max() > values.min())
+
+
+def conditional_variance(design: pd.DataFrame, by: List, kpis: List[str]) -> pd.Series:
+    """Var(E[kpi | by]) for every kpi, weighting the groups by their size"""
+    means = design.groupby(by, observed=True)[kpis].transform("mean")
+    return means.var(ddof=0)
+
+
+def main_effects(design: pd.DataFrame, kpis: List[str]) -> pd.DataFrame:
+    """Mean of each KPI per value of each input, relative to the overall mean
+
+    Returns a long table with columns input, value, kpi, mean, effect and count.
+    """
+    overall = design[kpis].mean()
+    tables = []
+    for column in input_columns(design, kpis):
+        grouped = design.groupby(column, observed=True)
+        table = (
+            grouped[kpis]
+            .mean()
+            .rename_axis(index="value", columns="kpi")
+            .stack()
+            .rename("mean")
+            .reset_index()
+        )
+        table["effect"] = table["mean"] - overall[table.kpi].values
+        table["count"] = grouped.size()[table.value].values
+        table.insert(0, "input", column)
+        tables.append(table)
+    if not tables:
+        return pd.DataFrame(
+            columns=["input", "value", "kpi", "mean", "effect", "count"]
+        )
+    return pd.concat(tables, ignore_index=True)
+
+
+def sobol_indices(design: pd.DataFrame, kpis: List[str]) -> pd.DataFrame:
+    """First (S1) and total (ST) order indices, indexed by (kpi, input)"""
+    columns = input_columns(design, kpis)
+    variance = kpi_variance(design, kpis)
+    rows = []
+    for column in columns:
+        first = conditional_variance(design, [column], kpis) / variance
+        others = [other for other in columns if other != column]
+        if others and design.groupby(others, observed=True).size().mean() >= 2:
+            total = 1 - conditional_variance(design, others, kpis) / variance
+        elif not others:
+            total = first
+        else:
+            total = pd.Series(np.nan, index=kpis)
+        rows.extend((kpi, column, first[kpi], total[kpi]) for kpi in kpis)
+    indices = pd.DataFrame(rows, columns=["kpi", "input", "S1", "ST"])
+    return indices.set_index(["kpi", "input"]).sort_index()
+
+
+def interaction_indices(
+    design: pd.DataFrame, kpis: List[str], first: pd.DataFrame = None
+) -> pd.DataFrame:
+    """Second order indices (S2) of every pair of inputs, indexed by (kpi, a, b)"""
+    if first is None:
+        first = sobol_indices(design, kpis)
+    variance = kpi_variance(design, kpis)
+    rows = []
+    for a, b in combinations(input_columns(design, kpis), 2):
+        joint = conditional_variance(design, [a, b], kpis) / variance
+        rows.extend(
+            (kpi, a, b, joint[kpi] - first.S1[(kpi, a)] - first.S1[(kpi, b)])
+            for kpi in kpis
+        )
+    interactions = pd.DataFrame(rows, columns=["kpi", "a", "b", "S2"])
+    return interactions.set_index(["kpi", "a", "b"]).sort_index()
+
+
+def sensitivity(
+    inputs: pd.DataFrame, results: pd.DataFrame, level: str, max_levels: int = 10
+) -> Dict[str, pd.DataFrame]:
+    """Main effects, first/total order and second order indices of all KPIs of a level"""
+    design = design_matrix(inputs, results, level, max_levels)
+    kpis = list(results.kpi.unique())
+    first = sobol_indices(design, kpis)
+    return {
+        "main_effects": main_effects(design, kpis),
+        "indices": first,
+        "interactions": interaction_indices(design, kpis, first),
+    }
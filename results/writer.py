@@ -0,0 +1,289 @@
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+import csv
+import json
+import time
+
+from .response import (
+    DASHBOARD_COLUMNS,
+    COST_BENEFIT_COLUMNS,
+    flatten_cost_benefit,
+)
+
+INPUT_COLUMNS = ["uuid", "id", "value"]
+ERROR_COLUMNS = ["error_msg"]
+TIMING_COLUMNS = ["connect", "ttfb", "download", "total"]
+
+# columns of the rows handed to the sinks, every row starts with the uuid
+TABLE_COLUMNS = {
+    "inputs": INPUT_COLUMNS,
+    "results": DASHBOARD_COLUMNS,
+    "cost_benefit": COST_BENEFIT_COLUMNS,
+    "errors": ["uuid", *ERROR_COLUMNS],
+    "timings": ["uuid", *TIMING_COLUMNS],
+}
+
+# in csv files these tables are indexed by uuid instead of a row number
+UUID_INDEXED = ("errors", "timings")
+
+OUTPUT_FORMATS = ("csv", "parquet")
+
+# rows of a table buffered by the parquet sink before they are written as a part file
+ROW_GROUP_SIZE = 100_000
+# the parquet sink also writes its buffer after this many points or seconds, so a
+# killed run loses at most these points
+FLUSH_POINTS = 500
+FLUSH_SECONDS = 60.0
+
+# files describing a run in its output folder
+CONFIG_FILE = "experiment.yaml"
+MANIFEST_FILE = "manifest.jsonl"
+SHARD_FILE = "shard.json"
+EVENTS_FILE = "events.jsonl"
+SKIPPED_FILE = "skipped.jsonl"
+PROFILE_FILE = "profile.json"
+
+Tables = Dict[str, List[Tuple]]
+ManifestEntry = Tuple[int, str, str, str]
+
+
+def create_run_folder(parent: Path) -> Path:
+    """Create a new <timestamp> folder for a run in parent
+
+    The folder is created exclusively, so runs that start in the same second, e.g. the
+    shards of an experiment and their merge, get a suffix (<timestamp>_2, ...) instead
+    of sharing it.
+    """
+    Path(parent).mkdir(parents=True, exist_ok=True)
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
+    folder, attempt = Path(parent) / timestamp, 1
+    while True:
+        try:
+            folder.mkdir()
+            return folder
+        except FileExistsError:
+            attempt += 1
+            folder = Path(parent) / f"{timestamp}_{attempt}"
+
+
+def append_to_csv(rows: List[Tuple], columns: List[str], path: Path, index=None):
+    """Append rows to a csv file in the layout of `DataFrame.to_csv`
+
+    The header is only written for a new file. Without an index, rows are numbered.
+    """
+    if index is None:
+        index = range(len(rows))
+
+    write_header = not path.exists()
+    with open(path, "a", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        if write_header:
+            writer.writerow(["", *columns])
+        writer.writerows([i, *row] for i, row in zip(index, rows))
+
+
+class CSVSink:
+    """Writes the tables of a run to csv files, appending every point right away
+
+    The files stay open during the run and are flushed after every point, so only the
+    rows of the current point are held in memory. Not thread safe, the caller should
+    serialize calls to write.
+    """
+
+    output_format = "csv"
+
+    def __init__(self, folder: Path, manifest) -> None:
+        self.folder = Path(folder)
+        self.manifest = manifest
+        self._files = {}
+
+    def writer(self, table: str):
+        """The csv writer of a table, opening its file (and writing the header) once"""
+        if table not in self._files:
+            path = self.folder / f"{table}.csv"
+            write_header = not path.exists()
+            f = open(path, "a", newline="")
+            writer = csv.writer(f, lineterminator="\n")
+            if write_header:
+                columns = TABLE_COLUMNS[table]
+                writer.writerow(
+                    ["", *(columns[1:] if table in UUID_INDEXED else columns)]
+                )
+            self._files[table] = (f, writer)
+        return self._files[table][1]
+
+    def write(self, tables: Tables, entry: ManifestEntry = None):
+        """Write the rows of a single point and mark it as done in the manifest"""
+        for table, rows in tables.items():
+            if table == "cost_benefit":
+                # nested results as JSON, so names with an apostrophe and nan round trip
+                rows = [(uuid, *map(json.dumps, cb)) for uuid, *cb in rows]
+            if table in UUID_INDEXED:
+                self.writer(table).writerows(rows)
+            else:
+                self.writer(table).writerows([i, *row] for i, row in enumerate(rows))
+            self._files[table][0].flush()
+
+        if entry is not None:
+            self.manifest.add(*entry)
+
+    def close(self):
+        for f, _ in self._files.values():
+            f.close()
+        self._files.clear()
+
+
+def parquet_schemas():
+    """Return the typed schemas of the parquet tables"""
+    import pyarrow as pa
+
+    return {
+        "inputs": pa.schema(
+            [("uuid", pa.string()), ("id", pa.int64()), ("value", pa.string())]
+        ),
+        "results": pa.schema(
+            [
+                ("uuid", pa.string()),
+                ("level", pa.string()),
+                ("kpi", pa.string()),
+                ("value", pa.float64()),
+            ]
+        ),
+        "cost_benefit": pa.schema(
+            [
+                ("uuid", pa.string()),
+                ("group", pa.string()),
+                ("counterparty", pa.string()),
+                ("actor", pa.string()),
+                ("value", pa.float64()),
+            ]
+        ),
+        "errors": pa.schema([("uuid", pa.string()), ("error_msg", pa.string())]),
+        "timings": pa.schema(
+            [("uuid", pa.string())]
+            + [(column, pa.float64()) for column in TIMING_COLUMNS]
+        ),
+    }
+
+
+class ParquetSink:
+    """Writes the tables of a run to typed parquet datasets
+
+    Every table is a folder `<table>.parquet` of part files. Cost benefit results are
+    flattened to long form (uuid, group, counterparty, actor, value). Rows are buffered
+    and written as new parts once a table has `row_group_size` rows buffered, after
+    `flush_points` points or `flush_seconds` seconds and on close, so memory use is
+    bounded by the buffer and a killed run only loses the points in the buffer. Points
+    are only marked as done in the manifest once their rows are written.
+
+    Not thread safe, the caller should serialize calls to write.
+    """
+
+    output_format = "parquet"
+
+    def __init__(
+        self,
+        folder: Path,
+        manifest,
+        row_group_size: int = ROW_GROUP_SIZE,
+        flush_points: int = FLUSH_POINTS,
+        flush_seconds: float = FLUSH_SECONDS,
+    ) -> None:
+        try:
+            import pyarrow
+        except ImportError as e:
+            raise ImportError(
+                "The parquet output format requires pyarrow, install it with "
+                "`poetry install -E parquet`"
+            ) from e
+
+        self.folder = Path(folder)
+        self.manifest = manifest
+        self.row_group_size = row_group_size
+        self.flush_points = flush_points
+        self.flush_seconds = flush_seconds
+        self.schemas = parquet_schemas()
+        self._rows: Tables = defaultdict(list)
+        self._entries: List[ManifestEntry] = []
+        self._points = 0
+        self._flushed_at = time.monotonic()
+
+    def write(self, tables: Tables, entry: ManifestEntry = None):
+        """Buffer the rows of a single point, writing the buffer when full or old"""
+        for table, rows in tables.items():
+            if table == "cost_benefit":
+                rows = [
+                    row for uuid, *cb in rows for row in flatten_cost_benefit(uuid, *cb)
+                ]
+            elif table == "inputs":
+                rows = [(uuid, id, str(value)) for uuid, id, value in rows]
+            self._rows[table].extend(rows)
+
+        if entry is not None:
+            self._entries.append(entry)
+        self._points += 1
+
+        if (
+            self._points >= self.flush_points
+            or time.monotonic() - self._flushed_at >= self.flush_seconds
+            or any(len(rows) >= self.row_group_size for rows in self._rows.values())
+        ):
+            self.flush()
+
+    def flush(self):
+        """Write the buffered rows as new part files and mark their points as done"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        for table, rows in self._rows.items():
+            if not rows:
+                continue
+            schema = self.schemas[table]
+            columns = list(zip(*rows))
+            data = pa.table(
+                [
+                    pa.array(column, type=field.type)
+                    for column, field in zip(columns, schema)
+                ],
+                schema=schema,
+            )
+
+            path = self.folder / f"{table}.parquet"
+            path.mkdir(exist_ok=True)
+            part = len(list(path.glob("part-*.parquet")))
+            pq.write_table(
+                data,
+                path / f"part-{part:05d}.parquet",
+                row_group_size=self.row_group_size,
+            )
+
+        for entry in self._entries:
+            self.manifest.add(*entry)
+
+        self._rows.clear()
+        self._entries.clear()
+        self._points = 0
+        self._flushed_at = time.monotonic()
+
+    def close(self):
+        self.flush()
+
+
+def open_sink(folder: Path, manifest, output_format: Union[str, None] = None):
+    """Open a sink for the tables of a run
+
+    Without an output format, the format of an existing run in the folder is used and
+    csv otherwise.
+    """
+    folder = Path(folder)
+    if output_format is None:
+        output_format = "parquet" if (folder / "inputs.parquet").exists() else "csv"
+
+    if output_format == "csv":
+        return CSVSink(folder, manifest)
+    if output_format == "parquet":
+        return ParquetSink(folder, manifest)
+    raise ValueError(
+        f"output_format should be one of {OUTPUT_FORMATS}, not {output_format}"
+    )
@@ -0,0 +1,129 @@
+import argparse
+from functools import partial
+from pathlib import Path
+from typing import Iterable, List, Union
+from urllib.parse import urlparse
+
+import yaml
+
+from experiment import Experiment
+from execution.scheduler import round_robin, run_tasks
+
+
+class ExperimentSuite:
+    """Several experiments whose points run through one shared pool of workers
+
+    Points are taken from the experiments in turn (round robin), so every experiment
+    gets an equal share of the workers while it has points left. Each experiment keeps
+    its own client and rate controller, and writes its outputs to its own folder as it
+    would when run on its own.
+    """
+
+    def __init__(self, experiments: List[Experiment]) -> None:
+        titles = [experiment.title for experiment in experiments]
+        if len(set(titles)) != len(titles):
+            # runs started in the same second would share an output folder
+            raise ValueError(f"The titles of the experiments should be unique: {titles}")
+        for experiment in experiments:
+            if experiment.adaptive is not None:
+                raise ValueError(f"Adaptive experiments ({experiment.title}) cannot run in a suite")
+        self.experiments = experiments
+
+    @classmethod
+    def load_from_yaml(cls, path: Union[str, Path]):
+        """Load a suite of experiment yaml files (relative to the suite file)
+
+        With `scenarios` and/or `base_urls`, every experiment is run for each of them,
+        their values are added to the titles of the experiments.
+        """
+        path = Path(path).resolve()
+        with open(path, "r") as f:
+            suite = yaml.safe_load(f)
+
+        experiments = []
+        for file in suite["experiments"]:
+            config_path = path.parent / file
+            with open(config_path, "r") as f:
+                config = yaml.safe_load(f)
+
+            for scenario_id in suite.get("scenarios") or [config["scenario_id"]]:
+                for base_url in suite.get("base_urls") or [config["base_url"]]:
+                    title = config["title"]
+                    if suite.get("scenarios"):
+                        title += f" - scenario {scenario_id}"
+                    if suite.get("base_urls"):
+                        title += f" - {urlparse(base_url).hostname}"
+                    experiment = Experiment(
+                        **{
+                            **config,
+                            "title": title,
+                            "scenario_id": scenario_id,
+                            "base_url": base_url,
+                        }
+                    )
+                    experiment.config_path = config_path
+                    experiments.append(experiment)
+        return cls(experiments)
+
+    @staticmethod
+    def tasks(experiment: Experiment, points: Iterable):
+        """(key, task) pairs running the points of an experiment"""
+        for point, interactive_elements in points:
+            task = partial(experiment.run_point, interactive_elements, point)
+            yield (experiment.title, point), task
+
+    def run(
+        self,
+        workers: int = 1,
+        disable_caching: bool = True,
+        enable_sentry_logging: bool = True,
+        local_cache: bool = False,
+        cache_errors: bool = False,
+        output_format: str = None,
+        skip_previous_runs: bool = False,
+        scheduler: str = None,
+    ):
+        """Run all experiments, with at most `workers` points in flight in total"""
+        print(f"Starting suite of {len(self.experiments)} experiments")
+        started = []
+        try:
+            for experiment in self.experiments:
+                points = experiment.start(
+                    disable_caching,
+                    enable_sentry_logging,
+                    workers,
+                    local_cache,
+                    cache_errors,
+                    output_format=output_format,
+                    inline_progress=False,
+                    skip_previous_runs=skip_previous_runs,
+                    scheduler=scheduler,
+                )
+                started.append((experiment, points))
+
+            run_tasks(
+                round_robin(self.tasks(experiment, points) for experiment, points in started),
+                workers,
+                scheduler=scheduler,
+            )
+        finally:
+            for experiment, _ in started:
+                experiment.finish()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a suite of experiments")
+    parser.add_argument("suite", help="yaml file listing the experiments")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--output-format", default=None, choices=["csv", "parquet"])
+    parser.add_argument("--local-cache", action="store_true")
+    args = parser.parse_args()
+
+    suite = ExperimentSuite.load_from_yaml(args.suite)
+    suite.run(
+        workers=args.workers,
+        disable_caching=False,
+        enable_sentry_logging=False,
+        local_cache=args.local_cache,
+        output_format=args.output_format,
+    )
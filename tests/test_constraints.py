@@ -0,0 +1,64 @@
+import pytest
+
+from input.constraints import Constraint, Constraints
+
+NAMES = ["electrification", "label", "households"]
+
+
+@pytest.mark.parametrize(
+    "expression, values, holds",
+    [
+        ("electrification < 40", {"electrification": 20}, True),
+        ("electrification < 40", {"electrification": 40}, False),
+        (
+            'label in ["F", "G"] and not electrification > 60',
+            {"label": "G", "electrification": 60},
+            True,
+        ),
+        ("label == 'A' or households * 2 >= 10", {"label": "B", "households": 5}, True),
+        ("-electrification + 10 > 0", {"electrification": 20}, False),
+    ],
+)
+def test_evaluates_expressions(expression, values, holds):
+    assert Constraint(expression, NAMES)(values) is holds
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "__import__('os').system('true')",
+        "label.upper() == 'G'",
+        "label[0] == 'G'",
+        "(lambda: True)()",
+        "[x for x in label]",
+        "electrification ** 2 > 100",
+    ],
+)
+def test_rejects_syntax_outside_the_whitelist(expression):
+    with pytest.raises(ValueError, match="may only use"):
+        Constraint(expression, NAMES)
+
+
+def test_rejects_unknown_names():
+    with pytest.raises(ValueError, match="not one of the inputs"):
+        Constraint("insulation == 'G'", NAMES)
+
+
+def test_rejects_statements():
+    with pytest.raises(ValueError, match="is not an expression"):
+        Constraint("electrification = 40", NAMES)
+
+
+def test_evaluation_errors_are_value_errors():
+    with pytest.raises(ValueError, match="cannot be evaluated"):
+        Constraint("households / electrification > 1", NAMES)(
+            {"households": 1, "electrification": 0}
+        )
+
+
+def test_a_point_is_skipped_if_any_constraint_holds():
+    constraints = Constraints(["electrification < 40", "label == 'G'"], NAMES)
+    assert len(constraints) == 2
+    assert constraints.skip({"electrification": 60, "label": "G"})
+    assert not constraints.skip({"electrification": 60, "label": "A"})
+    assert not Constraints([], NAMES).skip({"electrification": 0})
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from results.pareto import pareto_ranks, rank_results
+
+
+def brute_force_ranks(values: np.ndarray) -> np.ndarray:
+    """Ranks by peeling off the points no remaining point dominates, all minimized"""
+    ranks = np.zeros(len(values), dtype=int)
+    rank = 1
+    while (ranks == 0).any():
+        remaining = np.flatnonzero(ranks == 0)
+        front = [
+            i
+            for i in remaining
+            if not any(
+                (values[j] <= values[i]).all() and (values[j] < values[i]).any()
+                for j in remaining
+            )
+        ]
+        ranks[front] = rank
+        rank += 1
+    return ranks
+
+
+@pytest.mark.parametrize("objectives", [1, 2, 3, 4])
+@pytest.mark.parametrize("seed", range(25))
+def test_matches_brute_force(objectives, seed):
+    rng = np.random.default_rng(seed)
+    # few distinct values, so ties and duplicate points are common
+    values = rng.integers(0, 5, size=(rng.integers(1, 40), objectives)).astype(float)
+    np.testing.assert_array_equal(pareto_ranks(values), brute_force_ranks(values))
+
+
+def test_duplicate_points_share_a_rank():
+    values = np.array([[1.0, 2.0], [1.0, 2.0], [2.0, 3.0]])
+    np.testing.assert_array_equal(pareto_ranks(values), [1, 1, 2])
+
+
+def test_values_must_be_two_dimensional():
+    with pytest.raises(ValueError):
+        pareto_ranks(np.array([1.0, 2.0]))
+
+
+def test_rank_results_maximizes_and_leaves_out_errors():
+    results = pd.DataFrame(
+        [
+            ("a", "local", "costs", 1.0),
+            ("a", "local", "self_sufficiency", 0.2),
+            ("b", "local", "costs", 2.0),
+            ("b", "local", "self_sufficiency", 0.5),
+            ("c", "local", "costs", 3.0),
+            ("c", "local", "self_sufficiency", 0.4),
+            ("d", "local", "costs", 1.0),
+        ],
+        columns=["uuid", "level", "kpi", "value"],
+    )
+    ranked = rank_results(
+        results, {"local.costs": "min", "local.self_sufficiency": "max"}
+    )
+    assert ranked["rank"].to_dict() == {"a": 1, "b": 1, "c": 2}
+
+
+def test_rank_results_rejects_unknown_sense():
+    results = pd.DataFrame(columns=["uuid", "level", "kpi", "value"])
+    with pytest.raises(ValueError):
+        rank_results(results, {"local.costs": "lowest"})
@@ -0,0 +1,72 @@
+from itertools import product
+
+import pytest
+
+from input.inputelements import (
+    ContinousInteractiveElementSweep,
+    DiscreteInteractiveElementSweep,
+    SweepSpace,
+)
+
+
+@pytest.fixture
+def space():
+    return SweepSpace(
+        [
+            DiscreteInteractiveElementSweep(id=1, options=["A", "B", "C"]),
+            ContinousInteractiveElementSweep(
+                id=2, lower_bound=0, upper_bound=0.3, step=0.1
+            ),
+            DiscreteInteractiveElementSweep(id=3, options=["x", "y"]),
+        ]
+    )
+
+
+def values(point):
+    return tuple(ie.value for ie in point)
+
+
+def test_points_in_the_order_of_product(space):
+    expected = list(product(["A", "B", "C"], [0, 0.1, 0.2, 0.3], ["x", "y"]))
+    assert space.shape == (3, 4, 2)
+    assert len(space) == len(expected)
+    assert [values(point) for point in space] == expected
+    # the space can be iterated again
+    assert [values(point) for point in space] == expected
+
+
+def test_ravel_is_the_inverse_of_unravel(space):
+    for index in range(len(space)):
+        assert space.ravel(space.unravel(index)) == index
+
+
+def test_negative_indices_count_from_the_end(space):
+    points = list(space)
+    for index in range(-len(space), 0):
+        assert space[index] == points[index]
+
+
+@pytest.mark.parametrize(
+    "index",
+    [
+        slice(None),
+        slice(3, 10, 2),
+        slice(None, None, -1),
+        slice(-3, None),
+        slice(40, None),
+    ],
+)
+def test_slices_return_lists_of_points(space, index):
+    assert space[index] == list(space)[index]
+
+
+@pytest.mark.parametrize("index", [24, -25])
+def test_out_of_range(space, index):
+    with pytest.raises(IndexError, match=f"index {index} out of range"):
+        space[index]
+
+
+def test_space_without_sweeps_has_a_single_empty_point():
+    space = SweepSpace([])
+    assert len(space) == 1
+    assert list(space) == [()]